@@ -62,7 +62,7 @@ async def post_to_guilded(rss_feed_url, webhook_url):
                     continue
 
                 link = entry.link
-                thumbnail_url = entry.media_thumbnail[0]['url'] 
+                thumbnail_url = entry.media_thumbnail[0].get('url') if entry.get('media_thumbnail') else None
                 description = entry.description if hasattr(entry, 'description') else ''
 
                 # Use BeautifulSoup to remove img and br tags from the description
@@ -72,7 +72,8 @@ async def post_to_guilded(rss_feed_url, webhook_url):
 
                 # Create a Guilded embed
                 embed = guilded.Embed(title=title, description=f'{str(soup)}\n\n[Read more]({link})', color=0x00ffff, timestamp=pub_date_gmt)
-                embed.set_image(thumbnail_url)
+                if thumbnail_url:
+                    embed.set_image(thumbnail_url)
 
                 # Check if this entry has been processed before
                 if entry.link not in processed_entries:
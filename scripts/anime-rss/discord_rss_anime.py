@@ -121,19 +121,27 @@ async def post_to_discord(session: aiohttp.ClientSession, title: str, link: str,
         text = await resp.text()
         raise RuntimeError(f"Discord webhook error {resp.status}: {text}")
 
+async def fetch_feed(session: aiohttp.ClientSession, url: str) -> bytes:
+    """
+    Download the raw feed without blocking the event loop.
+    """
+    async with session.get(url) as resp:
+        resp.raise_for_status()
+        return await resp.read()
+
 async def run():
     if not DISCORD_WEBHOOK_URL or "discord.com/api/webhooks" not in DISCORD_WEBHOOK_URL:
         raise SystemExit("Please set DISCORD_WEBHOOK_URL to a valid Discord webhook.")
 
-    feed = feedparser.parse(RSS_FEED_URL)
-    if not feed.entries:
-        raise ValueError("No entries found in the RSS feed.")
+    async with aiohttp.ClientSession(timeout=aiohttp.ClientTimeout(total=30)) as session:
+        feed = feedparser.parse(await fetch_feed(session, RSS_FEED_URL))
+        if not feed.entries:
+            raise ValueError("No entries found in the RSS feed.")
 
-    processed = get_processed_entries()
-    utc = pytz.UTC
-    today_utc = datetime.now(utc).date()
+        processed = get_processed_entries()
+        utc = pytz.UTC
+        today_utc = datetime.now(utc).date()
 
-    async with aiohttp.ClientSession(timeout=aiohttp.ClientTimeout(total=30)) as session:
         for entry in feed.entries:
             pub_dt_utc = to_utc_datetime(entry)
             if pub_dt_utc.date() != today_utc:
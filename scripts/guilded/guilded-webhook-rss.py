@@ -2,11 +2,14 @@
 
 import feedparser
 import asyncio
-from datetime import datetime
+import aiohttp
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from functools import lru_cache
+from zoneinfo import ZoneInfo
 import guilded_webhook as guilded
 from bs4 import BeautifulSoup
 import configparser
-import pytz
 import os
 
 # Define the script version
@@ -38,36 +41,61 @@ def save_processed_entry(entry_link):
     with open(processed_entries_path, 'a+') as file:
         file.write(entry_link + '\n')
 
-# Enhanced date parsing function
-def parse_date(pub_date_str, rss_timezone):
-    timezone_offsets = {
-        "GMT": "+0000",
-        "UTC": "+0000",
-        "EST": "-0500",
-        "PST": "-0800",
-        # Add more timezone offsets as needed
-    }
-
-    supported_formats = [
-        "%a, %d %b %Y %H:%M:%S %z",
-        "%a, %d %b %Y %H:%M:%S %Z",
-        "%a, %d %b %Y %H:%M:%S",
-    ]
-
-    for format_str in supported_formats:
-        for tz_name, tz_offset in timezone_offsets.items():
-            formatted_date_str = pub_date_str.replace("+0000", tz_offset).replace("+00:00", tz_offset).replace("GMT", tz_name).replace("UTC", tz_name)
-            try:
-                return datetime.strptime(formatted_date_str, format_str)
-            except ValueError:
-                pass
-    
+# Date formats tried when an entry has no parsed date; RFC 822 dates
+# (including GMT/EST/PST names) are handled by parsedate_to_datetime
+supported_formats = [
+    "%a, %d %b %Y %H:%M:%S %z",
+    "%a, %d %b %Y %H:%M:%S",
+    "%Y-%m-%dT%H:%M:%S%z",
+    "%Y-%m-%d %H:%M:%S",
+]
+
+# The format that worked last for each feed, tried first next time
+date_format_cache = {}
+
+# Build each timezone object once
+@lru_cache(maxsize=None)
+def get_timezone(name):
+    return ZoneInfo(name)
+
+# Parse an entry's publication date into an aware datetime
+def parse_date(entry, rss_feed_url, rss_timezone_obj):
+    # feedparser has usually parsed the date already (in UTC)
+    parsed = entry.get('published_parsed') or entry.get('updated_parsed')
+    if parsed:
+        return datetime(*parsed[:6], tzinfo=timezone.utc)
+
+    pub_date_str = (entry.get('published') or entry.get('updated') or '').strip()
+    cached_format = date_format_cache.get(rss_feed_url)
+    formats = [cached_format] if cached_format else []
+    formats += [f for f in ['rfc822'] + supported_formats if f != cached_format]
+
+    for format_str in formats:
+        try:
+            if format_str == 'rfc822':
+                pub_date = parsedate_to_datetime(pub_date_str)
+            else:
+                pub_date = datetime.strptime(pub_date_str, format_str)
+        except (TypeError, ValueError):
+            continue
+        date_format_cache[rss_feed_url] = format_str
+        if pub_date.tzinfo is None:
+            pub_date = pub_date.replace(tzinfo=rss_timezone_obj)
+        return pub_date
+
     raise ValueError("Unable to parse date")
 
+# Function to download the raw feed without blocking the event loop
+async def fetch_feed(rss_feed_url):
+    async with aiohttp.ClientSession(timeout=aiohttp.ClientTimeout(total=30)) as session:
+        async with session.get(rss_feed_url) as resp:
+            resp.raise_for_status()
+            return await resp.read()
+
 async def post_to_guilded(rss_feed_url, webhook_url, rss_timezone, local_timezone):
     try:
         # Fetch and parse the RSS feed
-        feed = feedparser.parse(rss_feed_url)
+        feed = feedparser.parse(await fetch_feed(rss_feed_url))
 
         # Check if the feed has entries
         if not feed.entries:
@@ -79,19 +107,37 @@ async def post_to_guilded(rss_feed_url, webhook_url, rss_timezone, local_timezon
         # Get the list of processed entry links
         processed_entries = get_processed_entries()
 
+        # Build the timezone objects once, not per entry
+        rss_timezone_obj = get_timezone(rss_timezone)
+        local_timezone_obj = get_timezone(local_timezone)
+
         # Get the current date in your local timezone
-        current_date = datetime.now(pytz.timezone(local_timezone)).date()
+        current_date = datetime.now(local_timezone_obj).date()
 
-        # Process each entry
+        # Process each entry, cheapest checks first so skipped entries cost little
         for entry in feed.entries:
             title = entry.title
+            link = entry.link
+
+            # Check if this entry has been processed before
+            if link in processed_entries:
+                print(f'Skipping previously posted entry: {title}')
+                continue
+
+            # Parse the publication date and convert it to local time
+            pub_date = parse_date(entry, rss_feed_url, rss_timezone_obj)
+            pub_date_local = pub_date.astimezone(local_timezone_obj)
+
+            # Check if the entry's publication date matches the current date
+            if pub_date_local.date() != current_date:
+                print(f'Skipping entry with title: {title} (Not for the current date)')
+                continue
 
             # Check if any of the skip keywords are present in the title
             if any(keyword in title for keyword in skip_keywords):
                 print(f'Skipping entry with title: {title}')
                 continue
 
-            link = entry.link
             description = entry.description if hasattr(entry, 'description') else ''
 
             # Check for a thumbnail URL in media_thumbnail or media_content
@@ -109,36 +155,19 @@ async def post_to_guilded(rss_feed_url, webhook_url, rss_timezone, local_timezon
             for tag in soup.find_all(['img', 'br']):
                 tag.decompose()
 
-            # Parse the publication date from the entry using the enhanced function
-            pub_date_str = entry.published
-            pub_date = parse_date(pub_date_str, rss_timezone)
+            # Create a Guilded embed
+            embed = guilded.Embed(title=title, description=f'{str(soup)}\n\n[Read more]({link})', color=0x00ffff, timestamp=pub_date_local)
 
-            # Convert the RSS feed's time to local time
-            rss_timezone_obj = pytz.timezone(rss_timezone)
-            local_timezone_obj = pytz.timezone(local_timezone)
-            pub_date_local = pub_date.astimezone(rss_timezone_obj).astimezone(local_timezone_obj)
+            if thumbnail_url:
+                embed.set_image(thumbnail_url)
 
-            # Check if the entry's publication date matches the current date
-            if pub_date_local.date() == current_date:
-                # Create a Guilded embed
-                embed = guilded.Embed(title=title, description=f'{str(soup)}\n\n[Read more]({link})', color=0x00ffff, timestamp=pub_date_local)
+            # Send data to the webhook
+            await hook.send(content='', embeds=embed)
 
-                if thumbnail_url:
-                    embed.set_image(thumbnail_url)
+            print(f'Webhook successfully triggered for {title}')
 
-                # Check if this entry has been processed before
-                if entry.link not in processed_entries:
-                    # Send data to the webhook
-                    await hook.send(content='', embeds=embed)
-
-                    print(f'Webhook successfully triggered for {title}')
-
-                    # Update the list of processed entry links
-                    save_processed_entry(entry.link)
-                else:
-                    print(f'Skipping previously posted entry: {title}')
-            else:
-                print(f'Skipping entry with title: {title} (Not for the current date)')
+            # Update the list of processed entry links
+            save_processed_entry(link)
 
     except Exception as e:
         print(f'An error occurred: {str(e)}')
@@ -0,0 +1,6 @@
+"""
+Multi-feed RSS relay: polls every feed in config.ini from one asyncio process
+and posts new entries to Guilded or Discord webhooks.
+"""
+
+__version__ = "1.0"
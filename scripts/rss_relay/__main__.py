@@ -0,0 +1,112 @@
+#!/usr/bin/python3
+# -*- coding: utf-8 -*-
+
+import time
+
+STARTED = time.perf_counter()
+
+import argparse  # noqa: E402
+import os  # noqa: E402
+
+from . import __version__  # noqa: E402
+
+DEFAULT_CONFIG = os.path.join(os.path.dirname(os.path.abspath(__file__)), "config.ini")
+
+
+def main(argv=None) -> None:
+    parser = argparse.ArgumentParser(prog="rss_relay", description="Relay RSS feeds to Guilded/Discord webhooks.")
+    parser.add_argument("-c", "--config", default=DEFAULT_CONFIG, help="path to the feed registry (config.ini)")
+    parser.add_argument("--once", action="store_true", help="poll every feed once, deliver, and exit (cron mode)")
+    parser.add_argument("--import-processed", nargs=2, action="append", metavar=("FEED", "FILE"),
+                        help="import a processed_entries text file into a feed's dedup namespace "
+                             "(FEED.SINK for its second and later sinks) and exit")
+    parser.add_argument("--requeue-dead", action="store_true",
+                        help="move dead-letter deliveries back into the outbox and exit")
+    parser.add_argument("--profile", metavar="DIR",
+                        help="profile feed cycles with cProfile and tracemalloc and write the reports to DIR")
+    parser.add_argument("--profile-cycles", type=int, default=1, metavar="N",
+                        help="profiled cycles per feed (default 1; 0 keeps sampling in daemon mode)")
+    parser.add_argument("--profile-every", type=int, default=1, metavar="N",
+                        help="in daemon mode, profile one cycle out of every N per feed (default 1)")
+    parser.add_argument("--startup-report", action="store_true",
+                        help="print how long startup took, per phase and per imported module")
+    parser.add_argument("--version", action="version", version=f"%(prog)s {__version__}")
+    args = parser.parse_args(argv)
+
+    # Everything heavier than argparse is imported from here on, and only
+    # what the chosen command needs, so a cron run starts quickly
+    timer = None
+    if args.startup_report:
+        from .startup import StartupTimer
+        timer = StartupTimer(STARTED)
+        timer.mark("arguments")
+
+    from .config import DEDUP_DB_FILE, OUTBOX_FILE, load_config
+    settings, feeds = load_config(args.config)
+    if timer:
+        timer.mark("config")
+
+    if args.import_processed:
+        if settings.dedup_backend == "sqlite":
+            from .dedup import DedupDatabase
+            db = DedupDatabase(os.path.join(settings.state_dir, DEDUP_DB_FILE), ttl_days=settings.dedup_ttl_days)
+            try:
+                for feed_name, path in args.import_processed:
+                    count = db.import_text_file(feed_name, path)
+                    print(f"[{feed_name}] Imported {count} processed entries from {path}")
+            finally:
+                db.close()
+            return
+        if settings.dedup_backend not in ("hashindex", "text"):
+            parser.error(f"--import-processed does not support dedup_backend = {settings.dedup_backend}")
+        # The other backends keep one file per sink, so the namespace must name one
+        sinks = {sink.namespace: sink for feed in feeds for sink in feed.sinks}
+        for feed_name, _ in args.import_processed:
+            if feed_name not in sinks:
+                parser.error(f"unknown feed or sink for --import-processed: {feed_name}")
+        from .dedup import HashIndexStore, TextDedupStore
+        for feed_name, path in args.import_processed:
+            sink = sinks[feed_name]
+            if settings.dedup_backend == "hashindex":
+                store = HashIndexStore(os.path.join(settings.state_dir, f"{sink.namespace}.idx"))
+            else:
+                store = TextDedupStore(sink.state_file)
+            try:
+                count = store.import_text_file(path)
+            finally:
+                store.close()
+            print(f"[{feed_name}] Imported {count} processed entries from {path}")
+        return
+
+    if args.requeue_dead:
+        from .outbox import Outbox
+        outbox = Outbox(os.path.join(settings.state_dir, OUTBOX_FILE))
+        try:
+            print(f"Requeued {outbox.requeue_dead()} dead-letter deliveries")
+        finally:
+            outbox.close()
+        return
+
+    import asyncio
+    from .relay import Relay
+    profiler = None
+    if args.profile:
+        from .profiling import CycleProfiler
+        profiler = CycleProfiler(args.profile, cycles=args.profile_cycles, every=args.profile_every)
+    if timer:
+        timer.mark("imports")
+    relay = Relay(settings, feeds, profiler)
+    if timer:
+        timer.mark("state")
+    try:
+        asyncio.run(relay.run(once=args.once))
+    except KeyboardInterrupt:
+        pass
+    finally:
+        if timer:
+            timer.mark("run")
+            print(timer.report())
+
+
+if __name__ == "__main__":
+    main()
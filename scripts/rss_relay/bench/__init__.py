@@ -0,0 +1,7 @@
+"""
+Offline benchmarks for the relay. Run a module with python -m, e.g.
+
+    python -m rss_relay.bench.sanitize
+    python -m rss_relay.bench.stages --sizes 100,1000,10000
+    python -m rss_relay.bench.load --feeds 10 --entries 50
+"""
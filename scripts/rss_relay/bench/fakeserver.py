@@ -0,0 +1,192 @@
+#!/usr/bin/python3
+# -*- coding: utf-8 -*-
+
+import argparse
+import asyncio
+import hashlib
+import time
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+
+from aiohttp import web
+
+from .feeds import make_feed
+
+# Per-webhook limits, shaped like Discord's: 5 requests per 2 seconds
+WEBHOOK_LIMIT = 5
+WEBHOOK_WINDOW = 2.0
+# Limit over every webhook together, like Discord's global 50 requests per second
+GLOBAL_LIMIT = 50
+# Embeds per message: Discord takes up to 10, Guilded webhooks a single one
+MAX_EMBEDS = {"discord": 10, "guilded": 1}
+
+
+@dataclass
+class Window:
+    """
+    Fixed-window request counter for one rate-limit bucket.
+    """
+    limit: int
+    length: float
+    count: int = 0
+    reset_at: float = 0.0
+
+    def hit(self, now: float) -> bool:
+        if now >= self.reset_at:
+            self.count = 0
+            self.reset_at = now + self.length
+        if self.count >= self.limit:
+            return False
+        self.count += 1
+        return True
+
+
+@dataclass
+class ServerStats:
+    feed_requests: int = 0
+    not_modified: int = 0
+    messages: int = 0
+    embeds: int = 0
+    rate_limited: int = 0
+    global_limited: int = 0
+    rejected: int = 0
+    first_post: float | None = None
+    last_post: float | None = None
+    per_webhook: dict = field(default_factory=dict)
+
+
+class FakeServer:
+    """
+    Local stand-in for feed hosts and Discord/Guilded webhooks.
+
+    GET  /feeds/<name>.xml?entries=N&kind=rss|atom   synthetic feed (ETag aware)
+    POST /api/webhooks/<id>/<token>                  Discord-style webhook
+    POST /webhooks/<id>/<token>                      Guilded-style webhook
+
+    Every response waits `latency` seconds first. Webhooks answer with
+    X-RateLimit-* headers and, once a bucket is empty, a 429 carrying
+    retry_after (and a Retry-After header), like the real services do.
+    Payloads with no embeds or too many are rejected with 400.
+    """
+
+    def __init__(self, entries: int = 100, latency: float = 0.0, webhook_limit: int = WEBHOOK_LIMIT,
+                 webhook_window: float = WEBHOOK_WINDOW, global_limit: int = GLOBAL_LIMIT):
+        self.entries = entries
+        self.latency = latency
+        self.webhook_limit = webhook_limit
+        self.webhook_window = webhook_window
+        self.stats = ServerStats()
+        self._buckets: dict[str, Window] = {}
+        self._global = Window(global_limit, 1.0)
+        self._feeds: dict[tuple, tuple[bytes, str]] = {}
+        self._runner: web.AppRunner | None = None
+        self.app = web.Application()
+        self.app.router.add_get("/feeds/{name}.xml", self.feed)
+        self.app.router.add_post("/api/webhooks/{id}/{token}", self.discord)
+        self.app.router.add_post("/webhooks/{id}/{token}", self.guilded)
+
+    async def start(self, host: str = "127.0.0.1", port: int = 8799) -> None:
+        self._runner = web.AppRunner(self.app, access_log=None)
+        await self._runner.setup()
+        await web.TCPSite(self._runner, host, port).start()
+
+    async def stop(self) -> None:
+        if self._runner is not None:
+            await self._runner.cleanup()
+
+    async def feed(self, request: web.Request) -> web.Response:
+        if self.latency:
+            await asyncio.sleep(self.latency)
+        self.stats.feed_requests += 1
+        name = request.match_info["name"]
+        entries = int(request.query.get("entries", self.entries))
+        kind = request.query.get("kind", "rss")
+        key = (name, entries, kind)
+        if key not in self._feeds:
+            # Seeded by name so every feed has its own entries; dated now so they count as new
+            seed = int.from_bytes(hashlib.blake2b(name.encode(), digest_size=4).digest(), "big")
+            body, _ = make_feed(entries, kind, seed=seed, now=datetime.now(timezone.utc), spacing=60)
+            self._feeds[key] = (body, f'"{hashlib.blake2b(body, digest_size=8).hexdigest()}"')
+        body, etag = self._feeds[key]
+        if request.headers.get("If-None-Match") == etag:
+            self.stats.not_modified += 1
+            return web.Response(status=304, headers={"ETag": etag})
+        content_type = "application/atom+xml" if kind == "atom" else "application/rss+xml"
+        return web.Response(body=body, content_type=content_type, headers={"ETag": etag})
+
+    async def discord(self, request: web.Request) -> web.Response:
+        return await self._webhook(request, "discord")
+
+    async def guilded(self, request: web.Request) -> web.Response:
+        return await self._webhook(request, "guilded")
+
+    async def _webhook(self, request: web.Request, platform: str) -> web.Response:
+        if self.latency:
+            await asyncio.sleep(self.latency)
+        now = time.monotonic()
+        webhook = f"{platform}/{request.match_info['id']}"
+        bucket = self._buckets.setdefault(webhook, Window(self.webhook_limit, self.webhook_window))
+
+        if not self._global.hit(now):
+            self.stats.global_limited += 1
+            retry_after = max(self._global.reset_at - now, 0.01)
+            return web.json_response({"message": "You are being rate limited.", "retry_after": retry_after,
+                                      "global": True}, status=429,
+                                     headers={"Retry-After": f"{retry_after:.3f}", "X-RateLimit-Global": "true"})
+        if not bucket.hit(now):
+            self.stats.rate_limited += 1
+            retry_after = max(bucket.reset_at - now, 0.01)
+            return web.json_response({"message": "You are being rate limited.", "retry_after": retry_after,
+                                      "global": False}, status=429,
+                                     headers={"Retry-After": f"{retry_after:.3f}", **self._limit_headers(bucket, now)})
+
+        payload = await request.json()
+        embeds = payload.get("embeds") or []
+        if not embeds or len(embeds) > MAX_EMBEDS[platform]:
+            self.stats.rejected += 1
+            return web.json_response({"message": f"Invalid embed count {len(embeds)}"}, status=400)
+
+        self.stats.messages += 1
+        self.stats.embeds += len(embeds)
+        self.stats.per_webhook[webhook] = self.stats.per_webhook.get(webhook, 0) + len(embeds)
+        wall = time.perf_counter()
+        if self.stats.first_post is None:
+            self.stats.first_post = wall
+        self.stats.last_post = wall
+        return web.Response(status=204, headers=self._limit_headers(bucket, now))
+
+    @staticmethod
+    def _limit_headers(bucket: Window, now: float) -> dict:
+        return {
+            "X-RateLimit-Limit": str(bucket.limit),
+            "X-RateLimit-Remaining": str(max(bucket.limit - bucket.count, 0)),
+            "X-RateLimit-Reset-After": f"{max(bucket.reset_at - now, 0.0):.3f}",
+        }
+
+
+def main(argv=None) -> None:
+    parser = argparse.ArgumentParser(description="Serve synthetic feeds and fake Discord/Guilded webhooks.")
+    parser.add_argument("--port", type=int, default=8799)
+    parser.add_argument("--entries", type=int, default=100, help="default entries per feed")
+    parser.add_argument("--latency", type=float, default=0.0, help="seconds added to every response")
+    args = parser.parse_args(argv)
+
+    async def serve():
+        server = FakeServer(entries=args.entries, latency=args.latency)
+        await server.start(port=args.port)
+        print(f"Feeds:    http://127.0.0.1:{args.port}/feeds/<name>.xml")
+        print(f"Discord:  http://127.0.0.1:{args.port}/api/webhooks/<id>/<token>")
+        print(f"Guilded:  http://127.0.0.1:{args.port}/webhooks/<id>/<token>")
+        try:
+            await asyncio.Event().wait()
+        finally:
+            await server.stop()
+
+    try:
+        asyncio.run(serve())
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
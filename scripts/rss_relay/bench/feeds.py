@@ -0,0 +1,104 @@
+#!/usr/bin/python3
+# -*- coding: utf-8 -*-
+
+import random
+from datetime import datetime, timedelta, timezone
+from email.utils import format_datetime
+from xml.sax.saxutils import escape
+
+from .sanitize import make_description
+
+SHOWS = ("One Piece", "Frieren", "Jujutsu Kaisen", "Spy x Family", "Dandadan", "Oshi no Ko",
+         "Blue Lock", "Kaiju No. 8", "Solo Leveling", "Dr. Stone")
+DUBS = ("", "", "", "", " (Tamil Dub)", " (Hindi Dub)", " (Spanish Dub)", " (French Dub)", " (German Dub)")
+CATEGORIES = ("Anime", "Simulcast", "News", "Games", "Security", "Promo")
+
+
+def _date_string(rng: random.Random, dt: datetime) -> str:
+    """
+    The date formats seen in the wild, in roughly real-world proportions.
+    """
+    style = rng.random()
+    if style < 0.5:
+        return format_datetime(dt, usegmt=True)  # Mon, 06 Sep 2021 16:45:00 GMT
+    if style < 0.7:
+        return format_datetime(dt.astimezone(timezone(timedelta(hours=-5))))  # ... -0500
+    if style < 0.8:
+        return dt.astimezone(timezone(timedelta(hours=-5))).strftime("%a, %d %b %Y %H:%M:%S EST")
+    if style < 0.95:
+        return dt.isoformat().replace("+00:00", "Z")
+    return dt.strftime("%Y-%m-%d %H:%M:%S")  # no offset
+
+
+# Fixed so benchmark runs see identical documents
+BENCH_NOW = datetime(2024, 6, 1, 12, 0, tzinfo=timezone.utc)
+
+
+def make_items(rng: random.Random, count: int, now: datetime = BENCH_NOW, spacing: float = 900) -> list[dict]:
+    """
+    Synthetic entries, newest first and `spacing` seconds apart, with varied
+    titles, dates, media and HTML.
+    """
+    items = []
+    for i in range(count, 0, -1):
+        dt = now - timedelta(seconds=spacing * (count - i))
+        media = rng.random()
+        items.append({
+            "id": f"urn:bench:{i}",
+            "title": f"{rng.choice(SHOWS)} - Episode {rng.randint(1, 1100)}{rng.choice(DUBS)}",
+            "link": f"https://www.example.com/watch/{i}/{rng.randint(1, 10 ** 9)}",
+            "date": _date_string(rng, dt),
+            "iso": dt.isoformat().replace("+00:00", "Z"),  # Atom only allows RFC 3339
+            "description": make_description(rng, rng.randint(1, 6)),
+            "categories": rng.sample(CATEGORIES, rng.randint(0, 2)),
+            "thumbnail": f"https://img.example.com/{i}.jpg" if media < 0.5 else None,
+            "content": f"https://img.example.com/{i}-full.jpg" if 0.5 <= media < 0.8 else None,
+        })
+    return items
+
+
+def render_rss(items: list[dict]) -> bytes:
+    parts = ['<?xml version="1.0" encoding="UTF-8"?>',
+             '<rss version="2.0" xmlns:media="http://search.yahoo.com/mrss/" '
+             'xmlns:dc="http://purl.org/dc/elements/1.1/"><channel><title>Bench</title>']
+    for item in items:
+        parts.append("<item>")
+        parts.append(f"<title>{escape(item['title'])}</title><link>{escape(item['link'])}</link>")
+        parts.append(f"<guid>{item['id']}</guid><pubDate>{item['date']}</pubDate>")
+        parts.append(f"<description><![CDATA[{item['description']}]]></description>")
+        parts += [f"<category>{c}</category>" for c in item["categories"]]
+        if item["thumbnail"]:
+            parts.append(f'<media:thumbnail url="{item["thumbnail"]}" width="640" height="360"/>')
+        if item["content"]:
+            parts.append(f'<media:content url="{item["content"]}" type="image/jpeg" medium="image"/>')
+        parts.append("</item>")
+    parts.append("</channel></rss>")
+    return "".join(parts).encode("utf-8")
+
+
+def render_atom(items: list[dict]) -> bytes:
+    parts = ['<?xml version="1.0" encoding="UTF-8"?>',
+             '<feed xmlns="http://www.w3.org/2005/Atom" xmlns:media="http://search.yahoo.com/mrss/">'
+             '<title>Bench</title>']
+    for item in items:
+        parts.append("<entry>")
+        parts.append(f"<title>{escape(item['title'])}</title>")
+        parts.append(f'<link rel="alternate" href="{escape(item["link"])}"/>')
+        parts.append(f"<id>{item['id']}</id><updated>{item['iso']}</updated>")
+        parts.append(f'<summary type="html">{escape(item["description"])}</summary>')
+        parts += [f'<category term="{c}"/>' for c in item["categories"]]
+        if item["thumbnail"]:
+            parts.append(f'<media:thumbnail url="{item["thumbnail"]}"/>')
+        parts.append("</entry>")
+    parts.append("</feed>")
+    return "".join(parts).encode("utf-8")
+
+
+def make_feed(count: int, kind: str = "rss", seed: int = 1, now: datetime = BENCH_NOW,
+              spacing: float = 900) -> tuple[bytes, list[dict]]:
+    """
+    A feed document of `count` entries plus the items it was built from.
+    """
+    items = make_items(random.Random(seed), count, now, spacing)
+    body = render_atom(items) if kind == "atom" else render_rss(items)
+    return body, items
@@ -0,0 +1,124 @@
+#!/usr/bin/python3
+# -*- coding: utf-8 -*-
+
+import argparse
+import asyncio
+import contextlib
+import io
+import os
+import sqlite3
+import tempfile
+import time
+
+from ..config import OUTBOX_FILE, load_config
+from ..relay import Relay
+from .fakeserver import WEBHOOK_LIMIT, WEBHOOK_WINDOW, FakeServer
+
+
+def write_config(path: str, args, base_url: str) -> None:
+    """
+    A relay config with `feeds` feeds spread over `webhooks` fake webhooks,
+    each feed fanned out to `sinks` of them.
+    """
+    lines = [
+        "[relay]",
+        "state_dir = state",
+        f"delivery_workers = {args.delivery_workers}",
+        f"parse_processes = {args.parse_processes}",
+        "",
+    ]
+    for i in range(args.feeds):
+        sinks = []
+        for n in range(args.sinks):
+            webhook = (i + n) % args.webhooks
+            platform = args.platform
+            if platform == "mixed":
+                platform = "discord" if webhook % 2 == 0 else "guilded"
+            route = "api/webhooks" if platform == "discord" else "webhooks"
+            sinks.append(f"    {platform} {base_url}/{route}/{webhook}/token")
+        lines += [
+            f"[feed-{i}]",
+            f"rss_feed_url = {base_url}/feeds/feed-{i}.xml?entries={args.entries}&kind={args.kind}",
+            "sinks =",
+            *sinks,
+            f"parser = {args.parser}",
+            "only_today = false",
+            "og_image = false",
+            "",
+        ]
+    with open(path, "w", encoding="utf-8") as f:
+        f.write("\n".join(lines))
+
+
+def outbox_counts(path: str) -> dict[str, int]:
+    """
+    Outbox rows left after the run, by status (pending = waiting for a retry).
+    """
+    conn = sqlite3.connect(path)
+    try:
+        return dict(conn.execute("SELECT status, COUNT(*) FROM outbox GROUP BY status").fetchall())
+    finally:
+        conn.close()
+
+
+def report(args, server: FakeServer, relay: Relay, elapsed: float, left: dict[str, int]) -> None:
+    stats = server.stats
+    queued = sum(state.pipeline.totals["queued"] for state in relay.states.values())
+    drain = (stats.last_post - stats.first_post) if stats.first_post is not None else 0.0
+    print(f"feeds {args.feeds} x {args.entries} entries, {args.sinks} sink(s) each, {args.webhooks} webhooks "
+          f"({args.platform}), latency {args.latency * 1000:.0f} ms")
+    print(f"  entries queued       {queued:>10}")
+    print(f"  embeds delivered     {stats.embeds:>10}  in {stats.messages} messages")
+    print(f"  total time           {elapsed:>10.2f} s")
+    print(f"  backlog drain time   {drain:>10.2f} s  (first to last post)")
+    print(f"  throughput           {stats.embeds / elapsed if elapsed else 0.0:>10.1f} entries/s")
+    print(f"  429 responses        {stats.rate_limited:>10}  (+{stats.global_limited} global)")
+    print(f"  rejected payloads    {stats.rejected:>10}")
+    print(f"  left in outbox       {left.get('pending', 0):>10}  (+{left.get('dead', 0)} dead-letter)")
+
+
+async def run_load(args) -> None:
+    server = FakeServer(entries=args.entries, latency=args.latency,
+                        webhook_limit=args.webhook_limit, webhook_window=args.webhook_window)
+    await server.start(port=args.port)
+    try:
+        with tempfile.TemporaryDirectory() as workdir:
+            config_path = os.path.join(workdir, "config.ini")
+            write_config(config_path, args, f"http://127.0.0.1:{args.port}")
+            settings, feeds = load_config(config_path)
+            relay = Relay(settings, feeds)
+            # The relay logs a line per post; keep the report readable
+            quiet = contextlib.nullcontext() if args.verbose else contextlib.redirect_stdout(io.StringIO())
+            start = time.perf_counter()
+            with quiet:
+                await relay.run(once=True)
+            elapsed = time.perf_counter() - start
+            report(args, server, relay, elapsed, outbox_counts(os.path.join(settings.state_dir, OUTBOX_FILE)))
+    finally:
+        await server.stop()
+
+
+def main(argv=None) -> None:
+    parser = argparse.ArgumentParser(
+        description="Run the relay once against a local fake feed/webhook server and report delivery speed.")
+    parser.add_argument("--feeds", type=int, default=10)
+    parser.add_argument("--entries", type=int, default=50, help="entries per feed")
+    parser.add_argument("--kind", choices=("rss", "atom"), default="rss")
+    parser.add_argument("--webhooks", type=int, default=4, help="distinct fake webhooks")
+    parser.add_argument("--sinks", type=int, default=1, help="webhooks each feed is posted to")
+    parser.add_argument("--platform", choices=("discord", "guilded", "mixed"), default="discord")
+    parser.add_argument("--latency", type=float, default=0.02, help="seconds added to every server response")
+    parser.add_argument("--webhook-limit", type=int, default=WEBHOOK_LIMIT, help="posts per window per webhook")
+    parser.add_argument("--webhook-window", type=float, default=WEBHOOK_WINDOW, help="rate-limit window in seconds")
+    parser.add_argument("--parser", choices=("feedparser", "stream"), default="feedparser")
+    parser.add_argument("--parse-processes", default="0")
+    parser.add_argument("--delivery-workers", type=int, default=4)
+    parser.add_argument("--port", type=int, default=8799)
+    parser.add_argument("-v", "--verbose", action="store_true", help="show the relay's log")
+    args = parser.parse_args(argv)
+    args.sinks = min(args.sinks, args.webhooks)
+    asyncio.run(run_load(args))
+
+
+if __name__ == "__main__":
+    main()
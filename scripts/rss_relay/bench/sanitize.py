@@ -0,0 +1,81 @@
+#!/usr/bin/python3
+# -*- coding: utf-8 -*-
+
+import argparse
+import random
+import time
+
+from ..sanitize import MAX_EMBED_DESC, sanitize_description
+
+WORDS = ("anime", "episode", "release", "simulcast", "season", "update", "news", "patch",
+         "security", "breach", "game", "trailer", "review", "Crunchyroll", "&amp;", "&quot;")
+
+
+def make_description(rng: random.Random, paragraphs: int) -> str:
+    """
+    HTML shaped like real feed descriptions: paragraphs, inline markup,
+    images, line breaks and the occasional script or comment.
+    """
+    parts = [f'<img src="https://img.example.com/{rng.randint(1, 9999)}.jpg" alt="cover"/>']
+    for _ in range(paragraphs):
+        words = [rng.choice(WORDS) for _ in range(rng.randint(10, 60))]
+        if rng.random() < 0.5:
+            i = rng.randrange(len(words))
+            words[i] = f"<b>{words[i]}</b>"
+        if rng.random() < 0.5:
+            i = rng.randrange(len(words))
+            words[i] = f'<a href="https://example.com/{i}">{words[i]}</a>'
+        parts.append("<p>" + " ".join(words) + "</p>")
+        if rng.random() < 0.3:
+            parts.append("<br/>")
+        if rng.random() < 0.05:
+            parts.append("<script>track();</script><!-- ad -->")
+    return "".join(parts)
+
+
+def clean_with_bs4(html: str, strip_tags: list[str]) -> str:
+    """
+    The BeautifulSoup cleaning the standalone scripts use, as the reference.
+    """
+    from bs4 import BeautifulSoup
+
+    soup = BeautifulSoup(html or "", "html.parser")
+    for tag in soup.find_all(strip_tags):
+        tag.decompose()
+    text = soup.get_text(separator="\n", strip=True)
+    return (text[:MAX_EMBED_DESC - 20] + "…") if len(text) > MAX_EMBED_DESC else text
+
+
+def timed(func, samples, strip_tags) -> tuple[float, list[str]]:
+    start = time.perf_counter()
+    results = [func(html, strip_tags) for html in samples]
+    return time.perf_counter() - start, results
+
+
+def main(argv=None) -> None:
+    parser = argparse.ArgumentParser(description="Compare the HTML sanitizer with the BeautifulSoup path.")
+    parser.add_argument("-n", "--samples", type=int, default=2000, help="number of descriptions")
+    parser.add_argument("--paragraphs", type=int, default=4, help="paragraphs per description")
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args(argv)
+
+    rng = random.Random(args.seed)
+    samples = [make_description(rng, rng.randint(1, args.paragraphs * 2)) for _ in range(args.samples)]
+
+    for strip_tags in (["img", "br"], ["img", "br", "p"]):
+        fast_time, fast = timed(sanitize_description, samples, strip_tags)
+        print(f"strip {','.join(strip_tags)}:")
+        print(f"  sanitizer      {fast_time * 1e6 / len(samples):8.1f} us/entry")
+        try:
+            slow_time, slow = timed(clean_with_bs4, samples, strip_tags)
+        except ImportError:
+            print("  beautifulsoup  not installed, skipping comparison")
+            continue
+        mismatches = sum(a != b for a, b in zip(fast, slow))
+        print(f"  beautifulsoup  {slow_time * 1e6 / len(samples):8.1f} us/entry")
+        print(f"  speedup        {slow_time / fast_time:8.1f}x")
+        print(f"  parity         {len(samples) - mismatches}/{len(samples)} identical")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,217 @@
+#!/usr/bin/python3
+# -*- coding: utf-8 -*-
+
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+
+from ..dates import DateNormalizer
+from ..dedup import DedupDatabase, HashIndexStore
+from ..filters import KeywordFilter, Rule, parse_rule
+from ..sanitize import sanitize_description
+from ..stream import StreamingFeedParser
+from ..webhooks import DeliveryJob, pack_messages
+from .feeds import make_feed
+
+DEFAULT_SIZES = (100, 1000, 10000)
+STRIP_TAGS = ["img", "br"]
+SKIP_KEYWORDS = ["(Tamil Dub)", "(Telugu Dub)", "(Hindi Dub)", "(Italian Dub)", "(Castilian Dub)",
+                 "(French Dub)", "(German Dub)", "(Spanish Dub)", "(Portuguese Dub)"]
+CHUNK = 16384
+MEMORY_NOISE_KIB = 64  # peak-memory changes smaller than this are never flagged
+
+
+def stream_parse(body: bytes):
+    parser = StreamingFeedParser()
+    for i in range(0, len(body), CHUNK):
+        parser.feed(body[i:i + CHUNK])
+    return parser.close()
+
+
+def build_stages(size: int, kind: str, workdir: str):
+    """
+    One zero-argument callable per stage, each working on the same synthetic
+    feed and returning how many entries it handled, plus a close() for the
+    dedup stores.
+    """
+    body, items = make_feed(size, kind)
+    entries = stream_parse(body).entries
+    dates = [item["iso"] if kind == "atom" else item["date"] for item in items]
+    keyword_filter = KeywordFilter(
+        [],
+        [Rule("title", keyword) for keyword in SKIP_KEYWORDS] + [parse_rule("category/i: promo")],
+    )
+    keys = [entry.key for entry in entries]
+    known = keys[::2]  # half the lookups hit
+
+    db = DedupDatabase(os.path.join(workdir, f"dedup-{size}.sqlite3"), ttl_days=0, batch_size=len(known) + 1)
+    sqlite_store = db.store("bench")
+    for key in known:
+        sqlite_store.add(key)
+    sqlite_store.flush()
+    hash_store = HashIndexStore(os.path.join(workdir, f"dedup-{size}.idx"))
+    for key in known:
+        hash_store.add(key)
+    hash_store.merge()
+
+    descriptions = [sanitize_description(entry.description, STRIP_TAGS) for entry in entries]
+
+    def parse_feedparser():
+        from ..parse import parse_feed
+        return len(parse_feed(body).entries)
+
+    def parse_stream():
+        return len(stream_parse(body).entries)
+
+    def normalize_dates():
+        normalizer = DateNormalizer("UTC")
+        for value in dates:
+            normalizer.parse(value)
+        return len(dates)
+
+    def keyword_filter_stage():
+        for entry in entries:
+            keyword_filter.skip_reason(entry)
+        return len(entries)
+
+    def clean():
+        for entry in entries:
+            sanitize_description(entry.description, STRIP_TAGS)
+        return len(entries)
+
+    def dedup_sqlite():
+        for key in keys:
+            key in sqlite_store
+        return len(keys)
+
+    def dedup_hashindex():
+        for key in keys:
+            key in hash_store
+        return len(keys)
+
+    def render():
+        jobs = [DeliveryJob(feed_name="bench", webhook_type="discord", webhook_url="https://discord.invalid/hook",
+                            key=entry.key, title=entry.title, link=entry.link, description=description,
+                            timestamp=entry.published, thumbnail_url=entry.thumbnail_url)
+                for entry, description in zip(entries, descriptions)]
+        pack_messages(jobs)
+        return len(jobs)
+
+    stages = {
+        "parse_feedparser": parse_feedparser,
+        "parse_stream": parse_stream,
+        "dates": normalize_dates,
+        "filter": keyword_filter_stage,
+        "clean": clean,
+        "dedup_sqlite": dedup_sqlite,
+        "dedup_hashindex": dedup_hashindex,
+        "render": render,
+    }
+
+    def close():
+        db.close()
+        hash_store.close()
+
+    return stages, close
+
+
+def measure(func, repeat: int) -> dict:
+    """
+    Best-of-N wall time, then one more run under tracemalloc for peak memory
+    (tracing slows Python down, so it is kept out of the timed runs).
+    """
+    best = None
+    count = 0
+    for _ in range(repeat):
+        start = time.perf_counter()
+        count = func()
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    tracemalloc.start()
+    try:
+        func()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return {"seconds": best, "rate": count / best if best else 0.0, "peak_kib": peak / 1024}
+
+
+def run(sizes, kind: str, repeat: int, only: set[str] | None) -> dict:
+    results = {}
+    with tempfile.TemporaryDirectory() as workdir:
+        for size in sizes:
+            stages, close = build_stages(size, kind, workdir)
+            try:
+                for name, func in stages.items():
+                    if only and name not in only:
+                        continue
+                    try:
+                        result = measure(func, repeat)
+                    except ImportError as e:
+                        print(f"{name:<17} {size:>7}  skipped ({e})")
+                        continue
+                    results[f"{name}@{size}"] = result
+                    print(f"{name:<17} {size:>7}  {result['seconds'] * 1000:9.2f} ms"
+                          f"  {result['rate']:>12,.0f} entries/s  {result['peak_kib']:>10,.0f} KiB peak")
+            finally:
+                close()
+    return results
+
+
+def compare(results: dict, baseline: dict, threshold: float) -> list[str]:
+    """
+    Stages whose throughput dropped (or peak memory grew) by more than threshold.
+    """
+    regressions = []
+    print(f"\ncompared with baseline (threshold {threshold:.0%}):")
+    for name, result in results.items():
+        base = baseline.get(name)
+        if base is None:
+            print(f"  {name:<25} new")
+            continue
+        speed = result["rate"] / base["rate"] - 1 if base["rate"] else 0.0
+        memory = result["peak_kib"] / base["peak_kib"] - 1 if base["peak_kib"] else 0.0
+        flag = ""
+        grew = result["peak_kib"] - base["peak_kib"] > MEMORY_NOISE_KIB
+        if speed < -threshold or (memory > threshold and grew):
+            flag = "  REGRESSION"
+            regressions.append(name)
+        print(f"  {name:<25} throughput {speed:+7.1%}  peak memory {memory:+7.1%}{flag}")
+    return regressions
+
+
+def main(argv=None) -> None:
+    parser = argparse.ArgumentParser(description="Time every relay pipeline stage on synthetic feeds.")
+    parser.add_argument("--sizes", default=",".join(map(str, DEFAULT_SIZES)),
+                        help="comma-separated entry counts (up to 100000)")
+    parser.add_argument("--kind", choices=("rss", "atom"), default="rss")
+    parser.add_argument("--repeat", type=int, default=3, help="timed runs per stage; the best counts")
+    parser.add_argument("--stage", action="append", help="only run this stage (repeatable)")
+    parser.add_argument("--save", metavar="FILE", help="write the results as a baseline")
+    parser.add_argument("--baseline", metavar="FILE", help="compare with a saved baseline; exit 1 on regressions")
+    parser.add_argument("--threshold", type=float, default=0.10, help="allowed slowdown before flagging (0.10 = 10%%)")
+    args = parser.parse_args(argv)
+
+    sizes = [int(size) for size in args.sizes.split(",") if size]
+    results = run(sizes, args.kind, args.repeat, set(args.stage) if args.stage else None)
+
+    if args.save:
+        with open(args.save, "w", encoding="utf-8") as f:
+            json.dump({"kind": args.kind, "results": results}, f, indent=2, sort_keys=True)
+        print(f"\nbaseline written to {args.save}")
+
+    if args.baseline:
+        with open(args.baseline, "r", encoding="utf-8") as f:
+            baseline = json.load(f)
+        if baseline.get("kind", "rss") != args.kind:
+            print(f"baseline was recorded with --kind {baseline.get('kind')}")
+        if compare(results, baseline.get("results", {}), args.threshold):
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
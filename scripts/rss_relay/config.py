@@ -0,0 +1,221 @@
+#!/usr/bin/python3
+# -*- coding: utf-8 -*-
+
+import configparser
+import os
+from dataclasses import dataclass, field
+from zoneinfo import ZoneInfoNotFoundError
+
+from .dates import get_timezone
+
+# Section holding relay-wide settings; every other section is a feed
+RELAY_SECTION = "relay"
+
+DEFAULT_STRIP_TAGS = ["img", "br"]
+DEDUP_BACKENDS = ("sqlite", "hashindex", "text")
+PARSERS = ("feedparser", "stream")
+DESCRIPTION_FORMATS = ("text", "markdown")
+WEBHOOK_TYPES = ("guilded", "discord")
+
+# State files in state_dir; here rather than in relay.py so the maintenance
+# commands can open them without importing the relay and aiohttp
+VALIDATOR_CACHE_FILE = "http_cache.json"
+DEDUP_DB_FILE = "dedup.sqlite3"
+CURSOR_FILE = "cursors.json"
+OUTBOX_FILE = "outbox.sqlite3"
+SCHEDULE_FILE = "schedule.json"
+THUMBNAIL_FILE = "thumbnails.sqlite3"
+
+
+@dataclass
+class RelaySettings:
+    fetch_queue_size: int = 8
+    delivery_queue_size: int = 64
+    filter_workers: int = 2
+    delivery_workers: int = 4
+    fetch_limit_per_host: int = 4
+    parse_processes: int = 0
+    dedup_backend: str = "sqlite"
+    dedup_ttl_days: float = 90
+    delivery_max_attempts: int = 8
+    retry_base_delay: float = 5
+    retry_max_delay: float = 3600
+    state_dir: str = "."
+    metrics_port: int = 0  # 0 = no /metrics endpoint
+    metrics_host: str = "127.0.0.1"
+    metrics_textfile: str = ""  # empty = no textfile
+    metrics_interval: float = 15
+
+
+@dataclass
+class Sink:
+    """
+    One webhook a feed is delivered to. Each sink has its own dedup namespace,
+    so a failing webhook never blocks or re-posts to the others. A sink added
+    later only gets new entries: the backlog at or below the feed's cursor is
+    not posted to it.
+    """
+    name: str
+    webhook_type: str
+    webhook_url: str
+    namespace: str  # dedup namespace; the feed's first sink keeps the feed name
+    state_file: str  # legacy processed_entries file of this sink
+
+
+@dataclass
+class FeedConfig:
+    name: str
+    rss_feed_url: str
+    sinks: list[Sink] = field(default_factory=list)
+    skip_keywords: list[str] = field(default_factory=list)
+    include: list[str] = field(default_factory=list)
+    exclude: list[str] = field(default_factory=list)
+    strip_tags: list[str] = field(default_factory=lambda: list(DEFAULT_STRIP_TAGS))
+    local_timezone: str = "UTC"
+    rss_timezone: str = "UTC"
+    poll_interval: float = 300.0
+    min_poll_interval: float = 60.0
+    max_poll_interval: float = 3600.0
+    only_today: bool = True
+    parser: str = "feedparser"
+    markdown: bool = False
+    og_image: bool = True
+
+
+def _split_lines(value: str) -> list[str]:
+    """
+    Turn a multi-line ini value into a list, one item per non-empty line.
+    """
+    return [line.strip() for line in value.splitlines() if line.strip()]
+
+
+def _parse_sinks(feed_name: str, section, state_dir: str) -> list[Sink]:
+    """
+    Sinks of a feed section: every line of `sinks` is "<type> <url>";
+    without it, the single webhook_url/webhook_type pair is the only sink.
+    """
+    if "sinks" in section:
+        pairs = []
+        for line in _split_lines(section["sinks"]):
+            webhook_type, _, webhook_url = line.partition(" ")
+            pairs.append((webhook_type.lower(), webhook_url.strip()))
+    else:
+        pairs = [(section.get("webhook_type", "guilded").lower(), section["webhook_url"])]
+
+    sinks = []
+    for webhook_type, webhook_url in pairs:
+        if webhook_type not in WEBHOOK_TYPES:
+            raise ValueError(f"Feed section [{feed_name}] has unknown webhook_type: {webhook_type}")
+        if not webhook_url:
+            raise ValueError(f"Feed section [{feed_name}] has a sink without a webhook URL")
+        name = webhook_type
+        taken = {sink.name for sink in sinks}
+        n = 2
+        while name in taken:
+            name = f"{webhook_type}-{n}"
+            n += 1
+        if not sinks:
+            namespace = feed_name
+            state_file = section.get("state_file", f"processed_entries_{feed_name}.txt")
+        else:
+            namespace = f"{feed_name}.{name}"
+            state_file = f"processed_entries_{feed_name}_{name}.txt"
+        sinks.append(Sink(name, webhook_type, webhook_url, namespace, _resolve(state_dir, state_file)))
+    return sinks
+
+
+def _parse_processes(value: str) -> int:
+    """
+    "auto" sizes the parser pool to the host's cores; 0 parses in a thread.
+    """
+    if value.strip().lower() == "auto":
+        return os.cpu_count() or 1
+    return max(0, int(value))
+
+
+def _resolve(base_dir: str, path: str) -> str:
+    return path if os.path.isabs(path) else os.path.join(base_dir, path)
+
+
+def load_config(config_path: str) -> tuple[RelaySettings, list[FeedConfig]]:
+    """
+    Read the relay settings and the feed registry from config.ini.
+    Relative paths are resolved against the directory of the config file.
+    """
+    config = configparser.ConfigParser()
+    if not config.read(config_path, encoding="utf-8"):
+        raise FileNotFoundError(f"Config file not found: {config_path}")
+
+    base_dir = os.path.dirname(os.path.abspath(config_path))
+
+    settings = RelaySettings()
+    if config.has_section(RELAY_SECTION):
+        section = config[RELAY_SECTION]
+        settings.fetch_queue_size = section.getint("fetch_queue_size", settings.fetch_queue_size)
+        settings.delivery_queue_size = section.getint("delivery_queue_size", settings.delivery_queue_size)
+        settings.filter_workers = section.getint("filter_workers", settings.filter_workers)
+        settings.delivery_workers = section.getint("delivery_workers", settings.delivery_workers)
+        settings.fetch_limit_per_host = section.getint("fetch_limit_per_host", settings.fetch_limit_per_host)
+        settings.parse_processes = _parse_processes(section.get("parse_processes", "0"))
+        settings.dedup_backend = section.get("dedup_backend", settings.dedup_backend).lower()
+        settings.dedup_ttl_days = section.getfloat("dedup_ttl_days", settings.dedup_ttl_days)
+        settings.delivery_max_attempts = section.getint("delivery_max_attempts", settings.delivery_max_attempts)
+        settings.retry_base_delay = section.getfloat("retry_base_delay", settings.retry_base_delay)
+        settings.retry_max_delay = section.getfloat("retry_max_delay", settings.retry_max_delay)
+        settings.state_dir = section.get("state_dir", settings.state_dir)
+        settings.metrics_port = section.getint("metrics_port", settings.metrics_port)
+        settings.metrics_host = section.get("metrics_host", settings.metrics_host)
+        settings.metrics_textfile = section.get("metrics_textfile", settings.metrics_textfile)
+        settings.metrics_interval = section.getfloat("metrics_interval", settings.metrics_interval)
+    else:
+        settings.state_dir = config.defaults().get("state_dir", settings.state_dir)
+    settings.state_dir = _resolve(base_dir, settings.state_dir)
+    if settings.metrics_textfile:
+        settings.metrics_textfile = _resolve(base_dir, settings.metrics_textfile)
+    if settings.dedup_backend not in DEDUP_BACKENDS:
+        raise ValueError(f"Unknown dedup_backend: {settings.dedup_backend}")
+
+    feeds = []
+    for name in config.sections():
+        if name == RELAY_SECTION:
+            continue
+        section = config[name]
+        if "rss_feed_url" not in section or ("webhook_url" not in section and "sinks" not in section):
+            raise ValueError(f"Feed section [{name}] needs rss_feed_url and webhook_url (or sinks)")
+
+        parser = section.get("parser", "feedparser").lower()
+        if parser not in PARSERS:
+            raise ValueError(f"Feed section [{name}] has unknown parser: {parser}")
+
+        description_format = section.get("description_format", "text").lower()
+        if description_format not in DESCRIPTION_FORMATS:
+            raise ValueError(f"Feed section [{name}] has unknown description_format: {description_format}")
+
+        for option in ("local_timezone", "rss_timezone"):
+            try:
+                get_timezone(section.get(option, "UTC"))
+            except (ValueError, ZoneInfoNotFoundError):
+                raise ValueError(f"Feed section [{name}] has unknown {option}: {section.get(option)}") from None
+
+        feeds.append(FeedConfig(
+            name=name,
+            rss_feed_url=section["rss_feed_url"],
+            sinks=_parse_sinks(name, section, settings.state_dir),
+            skip_keywords=_split_lines(section.get("skip_keywords", "")),
+            include=_split_lines(section.get("include", "")),
+            exclude=_split_lines(section.get("exclude", "")),
+            strip_tags=_split_lines(section.get("strip_tags", "")) or list(DEFAULT_STRIP_TAGS),
+            local_timezone=section.get("local_timezone", "UTC"),
+            rss_timezone=section.get("rss_timezone", "UTC"),
+            poll_interval=section.getfloat("poll_interval", 300.0),
+            min_poll_interval=section.getfloat("min_poll_interval", 60.0),
+            max_poll_interval=section.getfloat("max_poll_interval", 3600.0),
+            only_today=section.getboolean("only_today", True),
+            parser=parser,
+            markdown=description_format == "markdown",
+            og_image=section.getboolean("og_image", True),
+        ))
+
+    if not feeds:
+        raise ValueError(f"No feed sections found in {config_path}")
+    return settings, feeds
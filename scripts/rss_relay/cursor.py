@@ -0,0 +1,87 @@
+#!/usr/bin/python3
+# -*- coding: utf-8 -*-
+
+import json
+import os
+from dataclasses import dataclass
+
+
+@dataclass
+class Cursor:
+    """
+    High-water mark of a feed: the newest entry that has been fully handled.
+    """
+    guid: str
+    published: float  # POSIX timestamp
+
+
+def is_newest_first(timestamps: list[float | None]) -> bool:
+    """
+    True if the feed lists entries newest first. Entries without a date make
+    the order unknowable, so they count as unordered.
+    """
+    if any(ts is None for ts in timestamps):
+        return False
+    return all(a >= b for a, b in zip(timestamps, timestamps[1:]))
+
+
+def count_new(guids: list[str], timestamps: list[float], cursor: Cursor) -> int:
+    """
+    Number of leading entries of a newest-first feed that are newer than the
+    cursor. Stops at the cursor's own entry or at the first older entry.
+    """
+    for i, (guid, ts) in enumerate(zip(guids, timestamps)):
+        if guid == cursor.guid or ts < cursor.published:
+            return i
+    return len(guids)
+
+
+class CursorStore:
+    """
+    Persisted per-feed cursors, plus a sticky flag for feeds seen out of order
+    (those always get a full scan). Stored as one JSON file in the state directory.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        data = self._load()
+        self._cursors: dict[str, dict] = data.get("cursors", {})
+        self._unordered: set[str] = set(data.get("unordered", []))
+
+    def _load(self) -> dict:
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                return json.load(f)
+        except (FileNotFoundError, ValueError):
+            return {}
+
+    def get(self, feed_name: str) -> Cursor | None:
+        """
+        The feed's cursor, or None when the feed must be scanned in full.
+        """
+        if feed_name in self._unordered or feed_name not in self._cursors:
+            return None
+        return Cursor(**self._cursors[feed_name])
+
+    def set(self, feed_name: str, cursor: Cursor) -> None:
+        entry = {"guid": cursor.guid, "published": cursor.published}
+        if self._cursors.get(feed_name) != entry:
+            self._cursors[feed_name] = entry
+            self.save()
+
+    def mark_unordered(self, feed_name: str) -> None:
+        if feed_name not in self._unordered:
+            print(f"[{feed_name}] Feed is not newest-first; using full scans")
+            self._unordered.add(feed_name)
+            self._cursors.pop(feed_name, None)
+            self.save()
+
+    def save(self) -> None:
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        tmp_path = self.path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump({"cursors": self._cursors, "unordered": sorted(self._unordered)},
+                      f, indent=2, sort_keys=True)
+        os.replace(tmp_path, self.path)
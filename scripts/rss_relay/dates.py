@@ -0,0 +1,107 @@
+#!/usr/bin/python3
+# -*- coding: utf-8 -*-
+
+import calendar
+from datetime import datetime, timezone, tzinfo
+from email.utils import parsedate_to_datetime
+from functools import lru_cache
+from zoneinfo import ZoneInfo
+
+UTC = timezone.utc
+
+
+def _rfc822(value: str) -> datetime:
+    # Handles RSS pubDate, including named zones such as GMT, EST and PST
+    return parsedate_to_datetime(value)
+
+
+def _iso8601(value: str) -> datetime:
+    # Atom and dc:date
+    return datetime.fromisoformat(value.replace("Z", "+00:00"))
+
+
+def _strptime(date_format: str):
+    def parse(value: str) -> datetime:
+        return datetime.strptime(value, date_format)
+    return parse
+
+
+# Tried in this order until one works; the winner is remembered per feed
+DATE_PARSERS = {
+    "rfc822": _rfc822,
+    "iso8601": _iso8601,
+    "ymd": _strptime("%Y-%m-%d %H:%M:%S"),
+    "ymd-slash": _strptime("%Y/%m/%d %H:%M:%S"),
+    "dmy": _strptime("%d/%m/%Y %H:%M:%S"),
+}
+
+
+@lru_cache(maxsize=None)
+def get_timezone(name: str) -> tzinfo:
+    """
+    Timezone by name, built once per process.
+    """
+    if name.upper() in ("UTC", "GMT", "Z"):
+        return UTC
+    return ZoneInfo(name)
+
+
+class DateNormalizer:
+    """
+    Turns an entry's date into a UTC epoch timestamp with one cheap call.
+
+    feedparser's published_parsed/updated_parsed are used when present (they
+    are already UTC). Otherwise the raw date string goes through DATE_PARSERS,
+    starting with whichever parser worked last for this feed, so a feed with an
+    odd format pays for the search once rather than on every entry. Dates with
+    no offset are read in the feed's own timezone.
+    """
+
+    def __init__(self, feed_timezone: str = "UTC", preferred: str | None = None):
+        self.feed_tz = get_timezone(feed_timezone)
+        self.preferred = preferred if preferred in DATE_PARSERS else None
+
+    def _order(self):
+        if self.preferred is not None:
+            yield self.preferred, DATE_PARSERS[self.preferred]
+        for name, parser in DATE_PARSERS.items():
+            if name != self.preferred:
+                yield name, parser
+
+    def parse(self, value: str | None) -> float | None:
+        if not value:
+            return None
+        value = value.strip()
+        for name, parser in self._order():
+            try:
+                dt = parser(value)
+            except (TypeError, ValueError, IndexError):
+                continue
+            self.preferred = name
+            if dt.tzinfo is None:
+                dt = dt.replace(tzinfo=self.feed_tz)
+            return dt.timestamp()
+        return None
+
+    def entry_timestamp(self, raw) -> float | None:
+        """
+        Timestamp of a feedparser entry: the parsed tuples first, then the strings.
+        """
+        for attr in ("published_parsed", "updated_parsed"):
+            parsed = getattr(raw, attr, None)
+            if parsed:
+                return calendar.timegm(parsed)
+        for attr in ("published", "updated"):
+            timestamp = self.parse(getattr(raw, attr, None))
+            if timestamp is not None:
+                return timestamp
+        return None
+
+
+def to_datetime(timestamp: float | None) -> datetime:
+    """
+    Aware UTC datetime for a timestamp; entries without a date count as new.
+    """
+    if timestamp is None:
+        return datetime.now(UTC)
+    return datetime.fromtimestamp(timestamp, UTC)
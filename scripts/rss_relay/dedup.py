@@ -0,0 +1,362 @@
+#!/usr/bin/python3
+# -*- coding: utf-8 -*-
+
+import bisect
+import hashlib
+import mmap
+import os
+import sqlite3
+import struct
+import time
+from array import array
+
+
+class TextDedupStore:
+    """
+    Processed-entry links kept in a plain text file, one link per line.
+    Same format as the processed_entries*.txt files of the standalone scripts.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._seen = self._load()
+
+    def _load(self) -> set:
+        if not os.path.exists(self.path):
+            return set()
+        with open(self.path, "r", encoding="utf-8") as f:
+            return set(line.strip() for line in f if line.strip())
+
+    def __contains__(self, key: str) -> bool:
+        return key in self._seen
+
+    def add(self, key: str) -> None:
+        if key in self._seen:
+            return
+        self._seen.add(key)
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with open(self.path, "a", encoding="utf-8") as f:
+            f.write(key + "\n")
+
+    def import_text_file(self, path: str) -> int:
+        """
+        Append the keys of another processed_entries file that are not known yet.
+        """
+        with open(path, "r", encoding="utf-8") as f:
+            keys = [key for key in dict.fromkeys(line.strip() for line in f) if key and key not in self._seen]
+        if keys:
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            with open(self.path, "a", encoding="utf-8") as f:
+                f.writelines(key + "\n" for key in keys)
+            self._seen.update(keys)
+        return len(keys)
+
+    def flush(self) -> None:
+        pass
+
+    def close(self) -> None:
+        pass
+
+
+class DedupDatabase:
+    """
+    SQLite store of processed entry keys shared by every feed.
+
+    Each feed gets its own namespace; rows carry the time the key was first seen
+    so keys older than ttl_days can be expired. Writes are buffered and committed
+    in one transaction per batch instead of reopening a file for every post.
+    """
+
+    EXPIRE_EVERY = 3600  # seconds between automatic expiry passes
+
+    def __init__(self, path: str, ttl_days: float = 90, batch_size: int = 50):
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self.path = path
+        self.ttl_seconds = ttl_days * 86400
+        self.batch_size = batch_size
+        self._batch: dict[tuple[str, str], int] = {}
+        self._last_expire = 0.0
+        self.conn = sqlite3.connect(path)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.execute(
+            "CREATE TABLE IF NOT EXISTS processed ("
+            " namespace TEXT NOT NULL,"
+            " key TEXT NOT NULL,"
+            " first_seen INTEGER NOT NULL,"
+            " PRIMARY KEY (namespace, key)"
+            ") WITHOUT ROWID"
+        )
+        self.conn.execute("CREATE INDEX IF NOT EXISTS processed_first_seen ON processed (first_seen)")
+        self.conn.commit()
+        self.expire()
+
+    def store(self, namespace: str, import_from: str | None = None) -> "SqliteDedupStore":
+        """
+        Open the namespace of one feed. If the namespace is still empty and a
+        legacy processed_entries text file exists, it is imported first and
+        renamed to *.imported.
+        """
+        if import_from and os.path.exists(import_from) and not self.has_namespace(namespace):
+            count = self.import_text_file(namespace, import_from)
+            # Renamed so an expired namespace is not seeded from it again
+            os.replace(import_from, import_from + ".imported")
+            print(f"[{namespace}] Imported {count} processed entries from {import_from}")
+        return SqliteDedupStore(self, namespace)
+
+    def has_namespace(self, namespace: str) -> bool:
+        row = self.conn.execute("SELECT 1 FROM processed WHERE namespace = ? LIMIT 1", (namespace,)).fetchone()
+        return row is not None
+
+    def contains(self, namespace: str, key: str) -> bool:
+        if (namespace, key) in self._batch:
+            return True
+        row = self.conn.execute("SELECT 1 FROM processed WHERE namespace = ? AND key = ?",
+                                (namespace, key)).fetchone()
+        return row is not None
+
+    def add(self, namespace: str, key: str) -> None:
+        self._batch.setdefault((namespace, key), int(time.time()))
+        if len(self._batch) >= self.batch_size:
+            self.flush()
+
+    def flush(self) -> None:
+        if self._batch:
+            with self.conn:
+                self.conn.executemany("INSERT OR IGNORE INTO processed (namespace, key, first_seen) VALUES (?, ?, ?)",
+                                      [(namespace, key, ts) for (namespace, key), ts in self._batch.items()])
+            self._batch.clear()
+        if time.time() - self._last_expire >= self.EXPIRE_EVERY:
+            self.expire()
+
+    def expire(self) -> int:
+        """
+        Delete keys first seen more than ttl_days ago. Returns the number removed.
+        """
+        self._last_expire = time.time()
+        if self.ttl_seconds <= 0:
+            return 0
+        with self.conn:
+            cur = self.conn.execute("DELETE FROM processed WHERE first_seen < ?",
+                                    (int(time.time() - self.ttl_seconds),))
+        return cur.rowcount
+
+    def import_text_file(self, namespace: str, path: str) -> int:
+        """
+        Bulk-load a processed_entries*.txt file into a namespace. Imported keys are
+        stamped with the file's modification time, so they expire like other keys.
+        """
+        first_seen = int(os.path.getmtime(path))
+        with open(path, "r", encoding="utf-8") as f:
+            rows = [(namespace, line.strip(), first_seen) for line in f if line.strip()]
+        with self.conn:
+            cur = self.conn.executemany("INSERT OR IGNORE INTO processed (namespace, key, first_seen) VALUES (?, ?, ?)",
+                                        rows)
+        return cur.rowcount
+
+    def close(self) -> None:
+        self.flush()
+        self.conn.close()
+
+
+class SqliteDedupStore:
+    """
+    One feed's view of a DedupDatabase, with the same interface as TextDedupStore.
+    """
+
+    def __init__(self, db: DedupDatabase, namespace: str):
+        self.db = db
+        self.namespace = namespace
+
+    def __contains__(self, key: str) -> bool:
+        return self.db.contains(self.namespace, key)
+
+    def add(self, key: str) -> None:
+        self.db.add(self.namespace, key)
+
+    def flush(self) -> None:
+        self.db.flush()
+
+    def close(self) -> None:
+        self.flush()
+
+
+def key_hash(key: str) -> int:
+    """
+    Fixed-width 64-bit hash of an entry key.
+    """
+    return int.from_bytes(hashlib.blake2b(key.encode("utf-8"), digest_size=8).digest(), "little")
+
+
+class HashIndexStore:
+    """
+    Processed-entry keys stored as sorted 64-bit hashes in a memory-mapped file.
+
+    File layout (native byte order):
+        header  magic, version, hash count, bloom size in bits, bloom probe count
+        bloom   Bloom filter over every hash in the file
+        hashes  sorted uint64 array, binary searched straight from the mmap
+
+    Opening the store maps the file without reading the hashes, so startup cost
+    and memory no longer grow with history. New keys are appended to a small
+    journal (path + ".log") and kept in a set until merge_threshold keys have
+    accumulated; the merge then rewrites the file with a fresh Bloom filter.
+    """
+
+    MAGIC = b"RRHX"
+    VERSION = 1
+    HEADER = struct.Struct("=4sIQQI4x")
+    BLOOM_BITS_PER_KEY = 10
+    BLOOM_PROBES = 7
+    MIN_BLOOM_BITS = 8192
+
+    def __init__(self, path: str, import_from: str | None = None, merge_threshold: int = 256):
+        self.path = path
+        self.journal_path = path + ".log"
+        self.merge_threshold = merge_threshold
+        self._recent: set[int] = set()
+        self._mm: mmap.mmap | None = None
+        self._bloom: memoryview | None = None
+        self._hashes: memoryview | None = None
+        self._bloom_bits = 0
+
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        if not os.path.exists(path):
+            hashes = set()
+            if import_from and os.path.exists(import_from):
+                with open(import_from, "r", encoding="utf-8") as f:
+                    hashes = {key_hash(line.strip()) for line in f if line.strip()}
+            self._write(sorted(hashes))
+            if import_from and os.path.exists(import_from):
+                os.replace(import_from, import_from + ".imported")
+                print(f"Imported {len(hashes)} processed entries from {import_from}")
+        self._map()
+        self._replay_journal()
+
+    # ------------------ file handling ------------------
+
+    def _write(self, hashes: list[int]) -> None:
+        bloom_bits = max(self.MIN_BLOOM_BITS, len(hashes) * self.BLOOM_BITS_PER_KEY)
+        bloom_bits = (bloom_bits + 7) // 8 * 8
+        bloom = bytearray(bloom_bits // 8)
+        for h in hashes:
+            for bit in self._probes(h, bloom_bits):
+                bloom[bit >> 3] |= 1 << (bit & 7)
+
+        tmp_path = self.path + ".tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(self.HEADER.pack(self.MAGIC, self.VERSION, len(hashes), bloom_bits, self.BLOOM_PROBES))
+            f.write(bloom)
+            f.write(array("Q", hashes).tobytes())
+        os.replace(tmp_path, self.path)
+
+    def _map(self) -> None:
+        with open(self.path, "rb") as f:
+            self._mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, version, count, bloom_bits, probes = self.HEADER.unpack_from(self._mm, 0)
+        if magic != self.MAGIC or version != self.VERSION or probes != self.BLOOM_PROBES:
+            raise ValueError(f"Not a dedup hash index: {self.path}")
+        view = memoryview(self._mm)
+        offset = self.HEADER.size
+        self._bloom_bits = bloom_bits
+        self._bloom = view[offset:offset + bloom_bits // 8]
+        offset += bloom_bits // 8
+        self._hashes = view[offset:offset + count * 8].cast("Q")
+
+    def _unmap(self) -> None:
+        for view in (self._bloom, self._hashes):
+            if view is not None:
+                view.release()
+        self._bloom = self._hashes = None
+        if self._mm is not None:
+            self._mm.close()
+            self._mm = None
+
+    def _replay_journal(self) -> None:
+        try:
+            with open(self.journal_path, "rb") as f:
+                data = f.read()
+        except FileNotFoundError:
+            return
+        usable = len(data) - len(data) % 8  # ignore a torn final write
+        self._recent.update(array("Q", data[:usable]))
+
+    # ------------------ lookups ------------------
+
+    @classmethod
+    def _probes(cls, h: int, bloom_bits: int):
+        h1 = h & 0xFFFFFFFF
+        h2 = (h >> 32) | 1
+        for i in range(cls.BLOOM_PROBES):
+            yield (h1 + i * h2) % bloom_bits
+
+    def _in_index(self, h: int) -> bool:
+        bloom = self._bloom
+        for bit in self._probes(h, self._bloom_bits):
+            if not bloom[bit >> 3] & (1 << (bit & 7)):
+                return False
+        hashes = self._hashes
+        i = bisect.bisect_left(hashes, h)
+        return i < len(hashes) and hashes[i] == h
+
+    def __contains__(self, key: str) -> bool:
+        h = key_hash(key)
+        return h in self._recent or self._in_index(h)
+
+    def __len__(self) -> int:
+        return len(self._hashes) + len(self._recent)
+
+    # ------------------ updates ------------------
+
+    def add(self, key: str) -> None:
+        h = key_hash(key)
+        if h in self._recent or self._in_index(h):
+            return
+        self._recent.add(h)
+        with open(self.journal_path, "ab") as f:
+            f.write(array("Q", [h]).tobytes())
+        if len(self._recent) >= self.merge_threshold:
+            self.merge()
+
+    def merge(self) -> None:
+        """
+        Fold the recent keys into the mapped index and clear the journal.
+        """
+        if not self._recent:
+            return
+        merged = sorted(set(self._hashes).union(self._recent))
+        self._unmap()
+        self._write(merged)
+        self._map()
+        self._recent.clear()
+        if os.path.exists(self.journal_path):
+            os.remove(self.journal_path)
+
+    def import_text_file(self, path: str) -> int:
+        """
+        Hash the keys of a processed_entries file and merge them into the index
+        in one rewrite. Returns the number of new keys.
+        """
+        with open(path, "r", encoding="utf-8") as f:
+            hashes = {key_hash(line.strip()) for line in f if line.strip()}
+        new = {h for h in hashes if h not in self._recent and not self._in_index(h)}
+        if new:
+            self._recent.update(new)
+            self.merge()
+        return len(new)
+
+    def flush(self) -> None:
+        # The journal already made every add durable; merging is periodic
+        pass
+
+    def close(self) -> None:
+        self.merge()
+        self._unmap()
@@ -0,0 +1,118 @@
+#!/usr/bin/python3
+# -*- coding: utf-8 -*-
+
+import asyncio
+import time
+from urllib.parse import urlsplit
+
+import aiohttp
+
+from .fetch import USER_AGENT
+from .ratelimit import RateLimiter
+from .webhooks import MAX_EMBEDS, DeliveryJob, WebhookError, deliver, pack_messages
+
+
+class DeliveryExecutor:
+    """
+    Posts delivery jobs with bounded parallelism across webhooks and strict
+    ordering within one.
+
+    Every webhook URL has a lane: a pending list plus at most one task that
+    drains it, so posts to the same channel never overlap and go out in
+    publication order (oldest first). Up to `concurrency` lanes post at the
+    same time; a lane gives its slot back after every batch so one busy
+    webhook cannot starve the others. Each sink host (discord.com,
+    media.guilded.gg, ...) gets its own keep-alive session.
+
+    finish(job, error, seconds) is called once per job after its message was
+    posted (error is None) or failed; seconds is how long the post took,
+    rate-limit waits included. A failed job goes back to the outbox and is
+    retried later, so it may land after newer entries of the same webhook.
+    """
+
+    def __init__(self, limiter: RateLimiter, finish, concurrency: int = 4, capacity: int = 64,
+                 timeout: float = 30, dns_cache_ttl: int = 300):
+        self.limiter = limiter
+        self.finish = finish
+        self.capacity = capacity
+        self.timeout = timeout
+        self.dns_cache_ttl = dns_cache_ttl
+        self._slots = asyncio.Semaphore(concurrency)
+        self._concurrency = concurrency
+        self._lanes: dict[str, list[DeliveryJob]] = {}
+        self._tasks: dict[str, asyncio.Task] = {}
+        self._sessions: dict[str, aiohttp.ClientSession] = {}
+        self.pending = 0
+
+    @property
+    def free(self) -> int:
+        return max(self.capacity - self.pending, 0)
+
+    def submit(self, job: DeliveryJob) -> None:
+        self._lanes.setdefault(job.webhook_url, []).append(job)
+        self.pending += 1
+        task = self._tasks.get(job.webhook_url)
+        if task is None or task.done():
+            self._tasks[job.webhook_url] = asyncio.create_task(self._drain(job.webhook_url))
+
+    def session(self, webhook_url: str) -> aiohttp.ClientSession:
+        host = urlsplit(webhook_url).netloc
+        session = self._sessions.get(host)
+        if session is None or session.closed:
+            connector = aiohttp.TCPConnector(limit_per_host=self._concurrency,
+                                             use_dns_cache=True, ttl_dns_cache=self.dns_cache_ttl)
+            session = aiohttp.ClientSession(connector=connector,
+                                            timeout=aiohttp.ClientTimeout(total=self.timeout),
+                                            headers={"User-Agent": USER_AGENT})
+            self._sessions[host] = session
+        return session
+
+    async def _drain(self, webhook_url: str) -> None:
+        lane = self._lanes[webhook_url]
+        while lane:
+            async with self._slots:
+                # Oldest first; ties (same timestamp) keep discovery order
+                lane.sort(key=lambda job: (job.timestamp, job.id or 0))
+                webhook_type = lane[0].webhook_type
+                batch = lane[:MAX_EMBEDS.get(webhook_type, 1)]
+                del lane[:len(batch)]
+                try:
+                    for packed in pack_messages(batch):
+                        for message, error, elapsed in await self._post(webhook_url, packed):
+                            for job, _ in message:
+                                try:
+                                    self.finish(job, error, elapsed)
+                                except Exception as e:
+                                    print(f"[{job.feed_name}] Could not record delivery of '{job.title}': {e}")
+                finally:
+                    self.pending -= len(batch)
+
+    async def _post(self, webhook_url: str, message: list) -> list[tuple[list, Exception | None, float]]:
+        """
+        Post one packed message; returns (message, error, seconds) per message
+        actually sent. A 4xx other than 429 on a multi-embed message is usually
+        one bad embed (say a rejected image URL), so each embed is then posted
+        alone and only the bad one fails.
+        """
+        start = time.perf_counter()
+        try:
+            await deliver(self.session(webhook_url), self.limiter, message)
+            error = None
+        except Exception as e:
+            error = e
+        elapsed = time.perf_counter() - start
+        if len(message) > 1 and isinstance(error, WebhookError) and 400 <= error.status < 500:
+            print(f"Webhook rejected a message of {len(message)} embeds ({error.status}); posting them one by one")
+            results = []
+            for item in message:
+                results += await self._post(webhook_url, [item])
+            return results
+        return [(message, error, elapsed)]
+
+    async def close(self) -> None:
+        for task in self._tasks.values():
+            task.cancel()
+        await asyncio.gather(*self._tasks.values(), return_exceptions=True)
+        for session in self._sessions.values():
+            await session.close()
+        self._sessions.clear()
@@ -0,0 +1,24 @@
+#!/usr/bin/python3
+# -*- coding: utf-8 -*-
+
+from dataclasses import dataclass
+from datetime import datetime
+
+
+@dataclass(slots=True)
+class Entry:
+    """
+    A feed entry reduced to the fields the relay needs. Parsers build it
+    straight from the document and drop the raw element or FeedParserDict, so
+    nothing else of an entry stays in memory. Slotted (no per-instance dict),
+    so it is small and cheap to pickle back from parser worker processes.
+    Not frozen: that would triple the cost of building one. The description
+    is the raw HTML; it is sanitized only for entries that get delivered.
+    """
+    key: str
+    title: str
+    link: str
+    published: datetime
+    description: str = ""
+    thumbnail_url: str | None = None
+    categories: tuple[str, ...] = ()
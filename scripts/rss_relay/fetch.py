@@ -0,0 +1,168 @@
+#!/usr/bin/python3
+# -*- coding: utf-8 -*-
+
+import json
+import os
+from dataclasses import dataclass
+
+import aiohttp
+
+try:
+    import brotli  # noqa: F401  (aiohttp decodes "br" only when brotli is installed)
+    ACCEPT_ENCODING = "gzip, deflate, br"
+except ImportError:
+    ACCEPT_ENCODING = "gzip, deflate"
+
+PERMANENT_REDIRECTS = (301, 308)
+STREAM_CHUNK_SIZE = 16384
+USER_AGENT = "rss_relay (+https://github.com/acortespr06/Python)"
+
+
+class ValidatorCache:
+    """
+    Persisted HTTP state per feed, stored as one small JSON file in the state directory:
+    ETag / Last-Modified values for conditional GETs, and permanent redirect
+    targets so hops such as feedburner are not repeated on every poll.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        data = self._load()
+        self._validators: dict[str, dict] = data.get("validators", {})
+        self._redirects: dict[str, str] = data.get("redirects", {})
+
+    def _load(self) -> dict:
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                return json.load(f)
+        except (FileNotFoundError, ValueError):
+            return {}
+
+    def get(self, feed_name: str) -> tuple[str | None, str | None]:
+        """
+        Return (etag, last_modified) for the feed, either may be None.
+        """
+        entry = self._validators.get(feed_name, {})
+        return entry.get("etag"), entry.get("last_modified")
+
+    def update(self, feed_name: str, etag: str | None, last_modified: str | None) -> None:
+        if not etag and not last_modified:
+            self.forget(feed_name)
+            return
+        entry = {"etag": etag, "last_modified": last_modified}
+        if self._validators.get(feed_name) != entry:
+            self._validators[feed_name] = entry
+            self.save()
+
+    def forget(self, feed_name: str) -> None:
+        """
+        Drop the validators so the next poll does a full, unconditional fetch.
+        """
+        if self._validators.pop(feed_name, None) is not None:
+            self.save()
+
+    def resolve(self, url: str) -> str:
+        return self._redirects.get(url, url)
+
+    def set_redirect(self, url: str, target: str | None) -> None:
+        if target is None or target == url:
+            if self._redirects.pop(url, None) is not None:
+                self.save()
+        elif self._redirects.get(url) != target:
+            self._redirects[url] = target
+            self.save()
+
+    def save(self) -> None:
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        tmp_path = self.path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump({"validators": self._validators, "redirects": self._redirects},
+                      f, indent=2, sort_keys=True)
+        os.replace(tmp_path, self.path)
+
+
+@dataclass
+class FetchResult:
+    status: int
+    body: bytes = b""
+    etag: str | None = None
+    last_modified: str | None = None
+    complete: bool = True  # False when the consumer stopped reading early
+
+    @property
+    def not_modified(self) -> bool:
+        return self.status == 304
+
+
+class FeedFetcher:
+    """
+    Fetches raw feed bytes over one shared keep-alive aiohttp session.
+    Parsing is left to the caller so network waits of many feeds overlap.
+    """
+
+    def __init__(self, validators: ValidatorCache, limit_per_host: int = 4,
+                 timeout: float = 30, dns_cache_ttl: int = 300):
+        self.validators = validators
+        self.limit_per_host = limit_per_host
+        self.timeout = timeout
+        self.dns_cache_ttl = dns_cache_ttl
+        self.session: aiohttp.ClientSession | None = None
+
+    async def __aenter__(self) -> "FeedFetcher":
+        connector = aiohttp.TCPConnector(limit_per_host=self.limit_per_host,
+                                         use_dns_cache=True, ttl_dns_cache=self.dns_cache_ttl)
+        self.session = aiohttp.ClientSession(
+            connector=connector,
+            timeout=aiohttp.ClientTimeout(total=self.timeout),
+            headers={"Accept-Encoding": ACCEPT_ENCODING, "User-Agent": USER_AGENT},
+        )
+        return self
+
+    async def __aexit__(self, *exc) -> None:
+        await self.session.close()
+
+    async def fetch(self, feed_name: str, url: str, consumer=None) -> FetchResult:
+        """
+        Conditional GET of the feed: the stored ETag / Last-Modified are sent so
+        an unchanged feed answers 304 without a body.
+
+        If consumer is given it is called with each chunk of the body as it
+        arrives; when it returns True the rest of the response is not read.
+        """
+        headers = {}
+        etag, last_modified = self.validators.get(feed_name)
+        if etag:
+            headers["If-None-Match"] = etag
+        if last_modified:
+            headers["If-Modified-Since"] = last_modified
+
+        request_url = self.validators.resolve(url)
+        async with self.session.get(request_url, headers=headers) as resp:
+            if resp.status == 304:
+                return FetchResult(status=304)
+            if resp.status >= 400:
+                if request_url != url:
+                    # The cached target went bad; start from the configured URL again
+                    self.validators.set_redirect(url, None)
+                raise RuntimeError(f"HTTP {resp.status} fetching {request_url}")
+
+            if resp.history and all(r.status in PERMANENT_REDIRECTS for r in resp.history):
+                self.validators.set_redirect(url, str(resp.url))
+
+            complete = True
+            if consumer is None:
+                body = await resp.read()
+            else:
+                chunks = []
+                async for chunk in resp.content.iter_chunked(STREAM_CHUNK_SIZE):
+                    chunks.append(chunk)
+                    if consumer(chunk):
+                        complete = False
+                        break
+                body = b"".join(chunks)
+            return FetchResult(status=resp.status, body=body,
+                               etag=resp.headers.get("ETag"),
+                               last_modified=resp.headers.get("Last-Modified"),
+                               complete=complete)
@@ -0,0 +1,138 @@
+#!/usr/bin/python3
+# -*- coding: utf-8 -*-
+
+import re
+from dataclasses import dataclass
+
+from .entry import Entry
+
+# Cheapest first: the description may have to be sanitized before it can be matched
+FIELDS = ("title", "category", "description")
+ANY_FIELD = "any"
+
+# "title/i,re: pattern" -> field "title", flags "i,re"
+_RULE_PREFIX = re.compile(r"^(title|description|category|any)(?:/([a-z,]+))?:\s*")
+
+
+@dataclass
+class Rule:
+    field: str
+    pattern: str
+    regex: bool = False
+    ignore_case: bool = False
+
+
+def parse_rule(line: str) -> Rule:
+    """
+    Parse one rule line from config.ini:
+
+        (Tamil Dub)                  literal, title, case-sensitive
+        title/i: uncensored          literal, title, case-insensitive
+        description/re: \\bsponsor    regex on the cleaned description
+        category/i,re: ^anime$       case-insensitive regex on any category
+        any: giveaway                title, description or category
+    """
+    match = _RULE_PREFIX.match(line)
+    if not match:
+        return Rule("title", line)
+    flags = set((match.group(2) or "").split(",")) - {""}
+    unknown = flags - {"i", "re"}
+    if unknown:
+        raise ValueError(f"Unknown rule flags {sorted(unknown)} in: {line}")
+    return Rule(match.group(1), line[match.end():], regex="re" in flags, ignore_case="i" in flags)
+
+
+def _trie_pattern(words: list[str]) -> str:
+    """
+    One regex alternation for many literals, factored into a prefix trie so the
+    engine only follows branches that match the current character instead of
+    trying every literal in turn.
+    """
+    trie: dict = {}
+    for word in words:
+        node = trie
+        for char in word:
+            node = node.setdefault(char, {})
+        node[""] = {}
+
+    def build(node: dict) -> str:
+        ends = "" in node
+        branches = [re.escape(char) + build(child) for char, child in sorted(node.items()) if char]
+        if not branches:
+            return ""
+        body = branches[0] if len(branches) == 1 else "(?:" + "|".join(branches) + ")"
+        return f"(?:{body})?" if ends else body
+
+    return build(trie)
+
+
+def _compile(rules: list[Rule]) -> re.Pattern | None:
+    """
+    Compile every rule for one field into a single pattern.
+    """
+    parts = []
+    for ignore_case in (False, True):
+        literals = [r.pattern.lower() if ignore_case else r.pattern
+                    for r in rules if not r.regex and r.ignore_case == ignore_case]
+        literals = [word for word in literals if word]
+        if literals:
+            trie = _trie_pattern(literals)
+            parts.append(f"(?i:{trie})" if ignore_case else trie)
+    for rule in rules:
+        if rule.regex:
+            re.compile(rule.pattern)  # report a bad pattern on its own line
+            parts.append(f"(?i:{rule.pattern})" if rule.ignore_case else f"(?:{rule.pattern})")
+    if not parts:
+        return None
+    # Categories are matched one per line, so ^ and $ anchor to a single category
+    return re.compile("|".join(parts), re.MULTILINE)
+
+
+def _field_patterns(rules: list[Rule]) -> dict[str, re.Pattern]:
+    patterns = {}
+    for field in FIELDS:
+        scoped = [r for r in rules if r.field in (field, ANY_FIELD)]
+        pattern = _compile(scoped)
+        if pattern is not None:
+            patterns[field] = pattern
+    return patterns
+
+
+class KeywordFilter:
+    """
+    Include/exclude rules of one feed, compiled once into a single pattern per
+    field, so each entry costs at most one regex search per field no matter
+    how many rules there are.
+
+    An entry is skipped if any exclude rule matches, or if include rules exist
+    and none of them match.
+    """
+
+    def __init__(self, include: list[Rule], exclude: list[Rule]):
+        self._include = _field_patterns(include)
+        self._exclude = _field_patterns(exclude)
+
+    @staticmethod
+    def _field_text(entry: Entry, field: str, describe) -> str:
+        if field == "category":
+            return "\n".join(entry.categories)
+        if field == "description":
+            return describe() if describe is not None else entry.description
+        return entry.title
+
+    def skip_reason(self, entry: Entry, describe=None) -> str | None:
+        """
+        Why the entry should be skipped, or None if it passes. describe() should
+        return the cleaned description; it is only called when a description
+        rule has to be checked.
+        """
+        for field, pattern in self._exclude.items():
+            match = pattern.search(self._field_text(entry, field, describe))
+            if match:
+                return f"{field} matches '{match.group(0)}'"
+        if self._include:
+            for field, pattern in self._include.items():
+                if pattern.search(self._field_text(entry, field, describe)):
+                    return None
+            return "no include rule matches"
+        return None
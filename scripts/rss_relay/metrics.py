@@ -0,0 +1,203 @@
+#!/usr/bin/python3
+# -*- coding: utf-8 -*-
+
+import asyncio
+import math
+import os
+
+# Seconds; covers a local parse (ms) up to a rate-limited delivery (minutes)
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120)
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _labels(names: tuple, values: tuple, extra: str = "") -> str:
+    parts = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        parts.append(extra)
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+
+def _number(value: float) -> str:
+    if value == math.inf:
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) and not value.is_integer() else str(int(value))
+
+
+class Metric:
+    """
+    A metric family with fixed label names; values are kept per label tuple.
+    """
+
+    kind = "untyped"
+
+    def __init__(self, name: str, help_text: str, labels: tuple = ()):
+        self.name = name
+        self.help = help_text
+        self.label_names = tuple(labels)
+        self._values: dict[tuple, float] = {}
+
+    def _key(self, labels: dict) -> tuple:
+        return tuple(labels.get(name, "") for name in self.label_names)
+
+    def samples(self):
+        for key, value in sorted(self._values.items()):
+            yield self.name, key, "", value
+
+    def render(self) -> list[str]:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} {self.kind}"]
+        for name, key, extra, value in self.samples():
+            lines.append(f"{name}{_labels(self.label_names, key, extra)} {_number(value)}")
+        return lines
+
+
+class Counter(Metric):
+    kind = "counter"
+
+    def inc(self, amount: float = 1, **labels) -> None:
+        key = self._key(labels)
+        self._values[key] = self._values.get(key, 0) + amount
+
+    def set_total(self, value: float, **labels) -> None:
+        # For counts that are kept elsewhere and copied in by a collector
+        self._values[self._key(labels)] = value
+
+
+class Gauge(Metric):
+    kind = "gauge"
+
+    def set(self, value: float, **labels) -> None:
+        self._values[self._key(labels)] = value
+
+
+class Histogram(Metric):
+    kind = "histogram"
+
+    def __init__(self, name: str, help_text: str, labels: tuple = (), buckets=DEFAULT_BUCKETS):
+        super().__init__(name, help_text, labels)
+        self.buckets = tuple(buckets) + (math.inf,)
+        self._histograms: dict[tuple, list] = {}  # key -> [bucket counts..., sum, count]
+
+    def observe(self, value: float, **labels) -> None:
+        key = self._key(labels)
+        data = self._histograms.get(key)
+        if data is None:
+            data = self._histograms[key] = [0] * len(self.buckets) + [0.0, 0]
+        for i, bound in enumerate(self.buckets):
+            if value <= bound:
+                data[i] += 1
+                break
+        data[-2] += value
+        data[-1] += 1
+
+    def samples(self):
+        n = len(self.buckets)
+        for key, data in sorted(self._histograms.items()):
+            cumulative = 0
+            for bound, count in zip(self.buckets, data[:n]):
+                cumulative += count
+                yield f"{self.name}_bucket", key, f'le="{_number(bound)}"', cumulative
+            yield f"{self.name}_sum", key, "", data[-2]
+            yield f"{self.name}_count", key, "", data[-1]
+
+
+class Registry:
+    """
+    Holds metric families and renders them in the Prometheus text format.
+    Collectors are called right before rendering to refresh gauges that are
+    cheaper to read on demand (queue depths).
+    """
+
+    def __init__(self):
+        self.metrics: list[Metric] = []
+        self.collectors = []
+
+    def add(self, metric: Metric) -> Metric:
+        self.metrics.append(metric)
+        return metric
+
+    def render(self) -> str:
+        for collect in self.collectors:
+            collect()
+        lines = []
+        for metric in self.metrics:
+            lines += metric.render()
+        return "\n".join(lines) + "\n"
+
+
+class RelayMetrics:
+    """
+    Every metric the relay records, labelled per feed (and sink for delivery).
+    """
+
+    def __init__(self):
+        self.registry = registry = Registry()
+        self.fetches = registry.add(Counter(
+            "rss_relay_fetches_total", "Feed fetches by HTTP status (or 'error').", ("feed", "status")))
+        self.fetch_bytes = registry.add(Counter(
+            "rss_relay_fetch_bytes_total", "Feed bytes downloaded.", ("feed",)))
+        self.fetch_seconds = registry.add(Histogram(
+            "rss_relay_fetch_seconds", "Time to download a feed.", ("feed",)))
+        self.parse_seconds = registry.add(Histogram(
+            "rss_relay_parse_seconds", "Time to parse a downloaded feed.", ("feed",)))
+        self.entries = registry.add(Counter(
+            "rss_relay_entries_total",
+            "Entries per pipeline outcome: seen, queued, or the stage that dropped them.", ("feed", "stage")))
+        self.render_seconds = registry.add(Histogram(
+            "rss_relay_render_seconds", "Time to clean and render one entry.", ("feed",)))
+        self.delivery_seconds = registry.add(Histogram(
+            "rss_relay_delivery_seconds", "Time the webhook post of an entry took, rate-limit waits included.",
+            ("feed", "sink")))
+        self.deliveries = registry.add(Counter(
+            "rss_relay_deliveries_total", "Delivery attempts by result (ok, retry, dead).",
+            ("feed", "sink", "result")))
+        self.rate_limited = registry.add(Counter(
+            "rss_relay_rate_limited_total", "429 responses from webhooks.", ()))
+        self.queue_depth = registry.add(Gauge(
+            "rss_relay_queue_depth", "Items waiting per queue (fetch, executor, outbox, dead).", ("queue",)))
+
+    def render(self) -> str:
+        return self.registry.render()
+
+
+async def serve_metrics(metrics: RelayMetrics, host: str, port: int):
+    """
+    Start a local HTTP server answering GET /metrics. Returns its AppRunner.
+    """
+    from aiohttp import web  # the server half of aiohttp is only loaded when metrics_port is set
+
+    async def handle(request: web.Request) -> web.Response:
+        return web.Response(body=metrics.render().encode("utf-8"), headers={"Content-Type": CONTENT_TYPE})
+
+    app = web.Application()
+    app.router.add_get("/metrics", handle)
+    runner = web.AppRunner(app, access_log=None)
+    await runner.setup()
+    await web.TCPSite(runner, host, port).start()
+    print(f"Serving metrics on http://{host}:{port}/metrics")
+    return runner
+
+
+def write_textfile(metrics: RelayMetrics, path: str) -> None:
+    """
+    Atomically write the metrics for node_exporter's textfile collector.
+    """
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        f.write(metrics.render())
+    os.replace(tmp_path, path)
+
+
+async def textfile_writer(metrics: RelayMetrics, path: str, interval: float) -> None:
+    while True:
+        await asyncio.sleep(interval)
+        try:
+            write_textfile(metrics, path)
+        except OSError as e:
+            print(f"Could not write metrics to {path}: {e}")
@@ -0,0 +1,170 @@
+#!/usr/bin/python3
+# -*- coding: utf-8 -*-
+
+import json
+import os
+import random
+import sqlite3
+import time
+from dataclasses import asdict
+from datetime import datetime
+
+from .webhooks import DeliveryJob
+
+
+def _dump_job(job: DeliveryJob) -> str:
+    data = asdict(job)
+    data.pop("id")
+    data["timestamp"] = job.timestamp.isoformat()
+    return json.dumps(data)
+
+
+def _load_job(job_id: int, raw: str) -> DeliveryJob:
+    data = json.loads(raw)
+    data["timestamp"] = datetime.fromisoformat(data["timestamp"])
+    return DeliveryJob(id=job_id, **data)
+
+
+class Outbox:
+    """
+    Durable queue of discovered entries waiting to be delivered.
+
+    The filter stage writes every new entry here and moves on, so fetching
+    never waits for a webhook. Rows leave the outbox only when delivered.
+    A failed post is rescheduled with jittered exponential backoff; after
+    max_attempts it is kept as 'dead' (dead-letter) until requeued by hand.
+    """
+
+    def __init__(self, path: str, max_attempts: int = 8, base_delay: float = 5, max_delay: float = 3600):
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self.max_attempts = max_attempts
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.conn = sqlite3.connect(path)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.execute(
+            "CREATE TABLE IF NOT EXISTS outbox ("
+            " id INTEGER PRIMARY KEY,"
+            " feed_name TEXT NOT NULL,"
+            " webhook_url TEXT NOT NULL,"
+            " key TEXT NOT NULL,"
+            " job TEXT NOT NULL,"
+            " status TEXT NOT NULL DEFAULT 'pending',"
+            " attempts INTEGER NOT NULL DEFAULT 0,"
+            " next_attempt REAL NOT NULL,"
+            " last_error TEXT,"
+            " published REAL NOT NULL DEFAULT 0,"
+            " UNIQUE (feed_name, key, webhook_url)"
+            ")"
+        )
+        self.conn.execute("CREATE INDEX IF NOT EXISTS outbox_due ON outbox (status, next_attempt)")
+        self._add_published_column()
+        self.conn.commit()
+
+    def _add_published_column(self) -> None:
+        """
+        Outboxes written before rows carried the entry's publish time get the
+        column, filled in from the stored jobs.
+        """
+        columns = [row[1] for row in self.conn.execute("PRAGMA table_info(outbox)")]
+        if "published" in columns:
+            return
+        self.conn.execute("ALTER TABLE outbox ADD COLUMN published REAL NOT NULL DEFAULT 0")
+        rows = self.conn.execute("SELECT id, job FROM outbox").fetchall()
+        self.conn.executemany("UPDATE outbox SET published = ? WHERE id = ?",
+                              [(_load_job(job_id, raw).timestamp.timestamp(), job_id) for job_id, raw in rows])
+
+    def enqueue(self, job: DeliveryJob) -> bool:
+        """
+        Record a discovered entry. Returns False if it was already queued.
+        """
+        with self.conn:
+            cur = self.conn.execute(
+                "INSERT OR IGNORE INTO outbox (feed_name, webhook_url, key, job, next_attempt, published) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (job.feed_name, job.webhook_url, job.key, _dump_job(job), time.time(), job.timestamp.timestamp()),
+            )
+        return cur.rowcount > 0
+
+    def contains(self, feed_name: str, key: str, webhook_url: str | None = None) -> bool:
+        if webhook_url is None:
+            row = self.conn.execute("SELECT 1 FROM outbox WHERE feed_name = ? AND key = ? LIMIT 1",
+                                    (feed_name, key)).fetchone()
+        else:
+            row = self.conn.execute("SELECT 1 FROM outbox WHERE feed_name = ? AND key = ? AND webhook_url = ?",
+                                    (feed_name, key, webhook_url)).fetchone()
+        return row is not None
+
+    def due(self, limit: int, exclude: set[int]) -> list[DeliveryJob]:
+        """
+        Pending jobs whose next attempt is due, skipping the ids in exclude.
+        Oldest entries come first, by publish time and then discovery order, so
+        a backlog larger than one batch still reaches each webhook in order.
+        """
+        rows = self.conn.execute(
+            "SELECT id, job FROM outbox WHERE status = 'pending' AND next_attempt <= ? "
+            "ORDER BY published, id LIMIT ?",
+            (time.time(), limit + len(exclude)),
+        ).fetchall()
+        return [_load_job(job_id, raw) for job_id, raw in rows if job_id not in exclude][:limit]
+
+    def next_due_in(self) -> float | None:
+        """
+        Seconds until the next pending job is due, or None if there is none.
+        """
+        row = self.conn.execute("SELECT MIN(next_attempt) FROM outbox WHERE status = 'pending'").fetchone()
+        if row[0] is None:
+            return None
+        return max(0.0, row[0] - time.time())
+
+    def counts(self) -> dict[str, int]:
+        """
+        Jobs per status: pending (including those waiting for a retry) and dead.
+        """
+        return dict(self.conn.execute("SELECT status, COUNT(*) FROM outbox GROUP BY status").fetchall())
+
+    def delivered(self, job_id: int) -> None:
+        with self.conn:
+            self.conn.execute("DELETE FROM outbox WHERE id = ?", (job_id,))
+
+    def failed(self, job_id: int, error: str) -> bool:
+        """
+        Reschedule a failed job. Returns True if it was moved to the dead-letter bucket.
+        """
+        row = self.conn.execute("SELECT attempts FROM outbox WHERE id = ?", (job_id,)).fetchone()
+        if row is None:
+            return False
+        attempts = row[0] + 1
+        if attempts >= self.max_attempts:
+            with self.conn:
+                self.conn.execute("UPDATE outbox SET status = 'dead', attempts = ?, last_error = ? WHERE id = ?",
+                                  (attempts, error, job_id))
+            return True
+        delay = min(self.max_delay, self.base_delay * 2 ** (attempts - 1))
+        delay *= random.uniform(0.5, 1.0)  # jitter so a recovering webhook is not hit all at once
+        with self.conn:
+            self.conn.execute("UPDATE outbox SET attempts = ?, next_attempt = ?, last_error = ? WHERE id = ?",
+                              (attempts, time.time() + delay, error, job_id))
+        return False
+
+    def dead_letter(self, job_id: int, error: str) -> None:
+        """
+        Move a job straight to the dead-letter bucket, without spending its attempts.
+        """
+        with self.conn:
+            self.conn.execute("UPDATE outbox SET status = 'dead', last_error = ? WHERE id = ?", (error, job_id))
+
+    def requeue_dead(self) -> int:
+        """
+        Move every dead-letter job back to pending with a fresh attempt count.
+        """
+        with self.conn:
+            cur = self.conn.execute("UPDATE outbox SET status = 'pending', attempts = 0, next_attempt = ? "
+                                    "WHERE status = 'dead'", (time.time(),))
+        return cur.rowcount
+
+    def close(self) -> None:
+        self.conn.close()
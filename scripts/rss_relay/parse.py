@@ -0,0 +1,106 @@
+#!/usr/bin/python3
+# -*- coding: utf-8 -*-
+
+import asyncio
+import sys
+from dataclasses import dataclass, field
+
+from .cursor import Cursor, count_new, is_newest_first
+from .dates import DateNormalizer, to_datetime
+from .entry import Entry
+
+
+def get_thumbnail(entry) -> str | None:
+    """
+    Try the common locations for media thumbnails in RSS entries.
+    """
+    for media in getattr(entry, "media_thumbnail", None) or []:
+        if isinstance(media, dict) and media.get("url"):
+            return media["url"]
+    for media in getattr(entry, "media_content", None) or []:
+        if isinstance(media, dict) and media.get("url") and media.get("type", "image/").startswith("image/"):
+            return media["url"]
+    return None
+
+
+def normalize_entry(raw, timestamp: float | None) -> Entry:
+    link = getattr(raw, "link", "") or ""
+    return Entry(
+        key=link,
+        title=getattr(raw, "title", "(no title)"),
+        link=link,
+        published=to_datetime(timestamp),
+        description=getattr(raw, "description", "") or "",
+        thumbnail_url=get_thumbnail(raw),
+        # Interned: the same few category names repeat across every entry
+        categories=tuple(sys.intern(tag["term"]) for tag in getattr(raw, "tags", None) or [] if tag.get("term")),
+    )
+
+
+@dataclass
+class ParseResult:
+    entries: list[Entry]
+    newest_first: bool
+    newest: Cursor | None = None  # position of the newest entry in the document
+    date_format: str | None = None  # date parser that worked, fed back in on the next parse
+    published: list[float] = field(default_factory=list)  # every dated entry read, for the scheduler
+
+
+def parse_feed(body: bytes, cursor: Cursor | None = None,
+               feed_timezone: str = "UTC", date_format: str | None = None) -> ParseResult:
+    """
+    Parse a feed document into entries (descriptions stay raw HTML until the
+    pipeline decides to deliver them). If the feed is newest-first and has a
+    cursor, entries from the cursor down are dropped before normalizing. Runs
+    in a worker process in process mode, so it must stay a plain top-level
+    function; the per-feed date format travels in and out as date_format.
+    """
+    # Imported on first use: a run whose feeds are all unchanged never needs it
+    import feedparser
+
+    dates = DateNormalizer(feed_timezone, date_format)
+    raws = feedparser.parse(body).entries
+    timestamps = [dates.entry_timestamp(raw) for raw in raws]
+    guids = [getattr(raw, "id", "") or getattr(raw, "link", "") for raw in raws]
+    newest_first = is_newest_first(timestamps)
+    newest = Cursor(guids[0], timestamps[0]) if raws and timestamps[0] is not None else None
+    if newest_first and cursor is not None:
+        raws = raws[:count_new(guids, timestamps, cursor)]
+    entries = [normalize_entry(raw, timestamp) for raw, timestamp in zip(raws, timestamps)]
+    published = [t for t in timestamps if t is not None]
+    return ParseResult(entries, newest_first, newest, dates.preferred, published)
+
+
+class FeedParserPool:
+    """
+    Runs parse_feed off the event loop.
+
+    processes=0 parses in a worker thread of this process (fine for a few feeds);
+    processes>0 sends the jobs to a ProcessPoolExecutor so CPU-heavy feeds use
+    every core and never stall delivery. parse(inline=True) parses on the
+    event loop itself, which only a profiled cycle wants: cProfile sees a
+    single thread.
+    """
+
+    def __init__(self, processes: int = 0):
+        self.processes = processes
+        self._executor = None
+        if processes > 0:
+            from concurrent.futures import ProcessPoolExecutor
+            self._executor = ProcessPoolExecutor(max_workers=processes)
+
+    async def parse(self, body: bytes, cursor: Cursor | None = None,
+                    feed_timezone: str = "UTC", date_format: str | None = None,
+                    inline: bool = False) -> ParseResult:
+        args = (body, cursor, feed_timezone, date_format)
+        if inline:
+            return parse_feed(*args)
+        if self._executor is None:
+            return await asyncio.to_thread(parse_feed, *args)
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, parse_feed, *args)
+
+    def close(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=True, cancel_futures=True)
+            self._executor = None
@@ -0,0 +1,148 @@
+#!/usr/bin/python3
+# -*- coding: utf-8 -*-
+
+import asyncio
+import time
+from collections import Counter
+from datetime import datetime
+
+from .config import FeedConfig, Sink
+from .entry import Entry
+from .filters import KeywordFilter
+from .sanitize import sanitize_description
+from .webhooks import DeliveryJob
+
+# Stage names, cheapest first; each counter says how many entries the stage removed
+STAGES = ("no_link", "dedup", "date", "keyword", "render")
+
+
+class EntryPipeline:
+    """
+    Decides which entries of a fetch get delivered, running the cheapest checks
+    first so already-posted entries cost a single lookup:
+
+        no_link -> dedup -> date window -> keyword filter -> render
+
+    The first three stages run on the event loop (the dedup stores belong to
+    it); the survivors are then filtered and rendered in one batch in a worker
+    thread, since sanitizing descriptions is CPU work. Descriptions arrive as
+    raw HTML and are only sanitized for entries that will actually be
+    delivered (or earlier, once, if a description filter rule needs the text).
+    An entry is rendered once and fanned out into one job per sink that has
+    not seen it yet; pending_sinks(key) returns those sinks. With metrics
+    (RelayMetrics), the render time of every queued entry is recorded.
+    """
+
+    def __init__(self, feed: FeedConfig, keyword_filter: KeywordFilter, pending_sinks, local_tz, metrics=None):
+        self.feed = feed
+        self.keyword_filter = keyword_filter
+        self.pending_sinks = pending_sinks
+        self.local_tz = local_tz
+        self.metrics = metrics
+        self.totals: Counter = Counter()  # since startup, per stage plus "seen" and "queued"
+
+    def clean(self, entry: Entry) -> str:
+        return sanitize_description(entry.description, self.feed.strip_tags, self.feed.markdown)
+
+    def select(self, entries: list[Entry], counts: Counter) -> list[tuple[Entry, list[Sink], datetime]]:
+        """
+        The no_link, dedup and date stages: (entry, pending sinks, local
+        publish time) of every entry that passes them.
+        """
+        feed = self.feed
+        today = datetime.now(self.local_tz).date()
+        selected = []
+        for entry in entries:
+            if not entry.link:
+                counts["no_link"] += 1
+                print(f"[{feed.name}] Skipping (no link): {entry.title}")
+                continue
+
+            sinks = self.pending_sinks(entry.key)
+            if not sinks:
+                counts["dedup"] += 1
+                continue
+
+            pub_dt = entry.published.astimezone(self.local_tz)
+            if feed.only_today and pub_dt.date() != today:
+                counts["date"] += 1
+                continue
+            selected.append((entry, sinks, pub_dt))
+        return selected
+
+    def render(self, selected: list[tuple[Entry, list[Sink], datetime]],
+               counts: Counter) -> tuple[list[DeliveryJob], list[float]]:
+        """
+        The keyword and render stages. Touches no relay state, so it can run
+        in a worker thread; returns the jobs and the render time of every
+        queued entry.
+        """
+        feed = self.feed
+        jobs = []
+        render_seconds = []
+        for entry, sinks, pub_dt in selected:
+            description = None
+
+            def describe() -> str:
+                nonlocal description
+                if description is None:
+                    description = self.clean(entry)
+                return description
+
+            reason = self.keyword_filter.skip_reason(entry, describe)
+            if reason:
+                counts["keyword"] += 1
+                print(f"[{feed.name}] Skipping ({reason}): {entry.title}")
+                continue
+
+            start = time.perf_counter()
+            try:
+                description = describe()
+            except Exception as e:
+                counts["render"] += 1
+                print(f"[{feed.name}] Skipping (render failed: {e}): {entry.title}")
+                continue
+            counts["queued"] += 1
+            for sink in sinks:
+                jobs.append(DeliveryJob(
+                    feed_name=feed.name,
+                    webhook_type=sink.webhook_type,
+                    webhook_url=sink.webhook_url,
+                    key=entry.key,
+                    title=entry.title,
+                    link=entry.link,
+                    description=description,
+                    timestamp=pub_dt,
+                    thumbnail_url=entry.thumbnail_url,
+                    sink=sink.name,
+                ))
+            render_seconds.append(time.perf_counter() - start)
+        return jobs, render_seconds
+
+    async def run(self, entries: list[Entry], inline: bool = False) -> tuple[list[DeliveryJob], Counter]:
+        """
+        All stages; inline=True renders on the event loop (for profiling).
+        """
+        counts: Counter = Counter(seen=len(entries))
+        selected = self.select(entries, counts)
+        if not selected:
+            jobs, render_seconds = [], []
+        elif inline:
+            jobs, render_seconds = self.render(selected, counts)
+        else:
+            jobs, render_seconds = await asyncio.to_thread(self.render, selected, counts)
+        if self.metrics is not None:
+            for seconds in render_seconds:
+                self.metrics.render_seconds.observe(seconds, feed=self.feed.name)
+        self.totals.update(counts)
+        return jobs, counts
+
+
+def format_counts(counts: Counter) -> str:
+    """
+    One-line summary such as "50 seen, 45 dedup, 3 date, 1 keyword, 1 queued".
+    """
+    parts = [f"{counts['seen']} seen"]
+    parts += [f"{counts[stage]} {stage}" for stage in STAGES if counts[stage]]
+    parts.append(f"{counts['queued']} queued")
+    return ", ".join(parts)
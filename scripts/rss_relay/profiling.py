@@ -0,0 +1,151 @@
+#!/usr/bin/python3
+# -*- coding: utf-8 -*-
+
+import asyncio
+import contextlib
+import cProfile
+import os
+import pstats
+import re
+import time
+import tracemalloc
+from collections import Counter
+
+TOP_FUNCTIONS = 30
+TOP_ALLOCATIONS = 20
+MIN_STACK_SECONDS = 1e-5  # call paths cheaper than this are left out of the collapsed stacks
+MAX_STACK_DEPTH = 96
+TRACE_FILTERS = (
+    tracemalloc.Filter(False, tracemalloc.__file__),
+    tracemalloc.Filter(False, "<frozen importlib._bootstrap>"),
+    tracemalloc.Filter(False, "<frozen importlib._bootstrap_external>"),
+)
+
+
+def _label(func: tuple) -> str:
+    filename, lineno, name = func
+    if filename == "~":  # built-in, e.g. <method 'poll' of 'select.epoll' objects>
+        return name.replace(";", ",")
+    return f"{name} ({os.path.basename(filename)}:{lineno})".replace(";", ",")
+
+
+def collapsed_stacks(stats: pstats.Stats) -> list[str]:
+    """
+    Approximate call stacks in the "frame;frame;frame microseconds" format of
+    flamegraph.pl, speedscope and inferno.
+
+    cProfile only records caller -> callee edges, so a function's time is
+    split over the paths leading to it in proportion to what each caller
+    spent in it.
+    """
+    callees: dict[tuple, dict[tuple, float]] = {}
+    roots = []
+    for func, (_, _, _, _, callers) in stats.stats.items():
+        if not callers:
+            roots.append(func)
+        for caller, (_, _, _, cumtime) in callers.items():
+            callees.setdefault(caller, {})[func] = cumtime
+
+    totals: Counter = Counter()
+
+    def walk(func: tuple, path: list[str], seen: set, share: float) -> None:
+        _, _, tottime, cumtime, _ = stats.stats[func]
+        fraction = share / cumtime if cumtime else 0.0
+        path = path + [_label(func)]
+        totals[";".join(path)] += tottime * fraction
+        if len(path) >= MAX_STACK_DEPTH:
+            return
+        for callee, callee_time in callees.get(func, {}).items():
+            child_share = callee_time * fraction
+            if callee not in seen and child_share >= MIN_STACK_SECONDS:
+                walk(callee, path, seen | {callee}, child_share)
+
+    for root in roots:
+        walk(root, [], {root}, stats.stats[root][3])
+    return [f"{stack} {round(seconds * 1e6)}" for stack, seconds in sorted(totals.items())
+            if round(seconds * 1e6) > 0]
+
+
+class CycleProfiler:
+    """
+    Profiles whole feed cycles (fetch, parse, filter, render and, with --once,
+    delivery) with cProfile and tracemalloc, and writes for every profiled
+    cycle to `directory`:
+
+        <feed>-<n>.txt          wall time, peak memory, hottest functions and allocation sites
+        <feed>-<n>.pstats       the raw profile, for pstats or snakeviz
+        <feed>-<n>.collapsed    collapsed stacks, for flamegraph.pl or speedscope
+        <feed>-<n>.tracemalloc  the allocation snapshot, for tracemalloc.Snapshot.load
+
+    One cycle out of every `every` of a feed is profiled, `cycles` times per
+    feed (0 = keep sampling). Profiled cycles never overlap, but other feeds
+    that run meanwhile show up in the profile too.
+    """
+
+    def __init__(self, directory: str, cycles: int = 1, every: int = 1):
+        self.directory = directory
+        self.cycles = cycles
+        self.every = max(every, 1)
+        self._seen: Counter = Counter()
+        self._taken: Counter = Counter()
+        self._lock = asyncio.Lock()
+
+    def wants(self, feed_name: str) -> bool:
+        """
+        Count a cycle of the feed; True if this one should be profiled.
+        """
+        self._seen[feed_name] += 1
+        if self.cycles and self._taken[feed_name] >= self.cycles:
+            return False
+        return self._seen[feed_name] % self.every == 0
+
+    @contextlib.asynccontextmanager
+    async def profile(self, feed_name: str):
+        async with self._lock:
+            self._taken[feed_name] += 1
+            cycle = self._taken[feed_name]
+            was_tracing = tracemalloc.is_tracing()
+            if not was_tracing:
+                tracemalloc.start()
+            tracemalloc.reset_peak()
+            profiler = cProfile.Profile()
+            start = time.perf_counter()
+            profiler.enable()
+            try:
+                yield
+            finally:
+                profiler.disable()
+                elapsed = time.perf_counter() - start
+                snapshot = tracemalloc.take_snapshot().filter_traces(TRACE_FILTERS)
+                _, peak = tracemalloc.get_traced_memory()
+                if not was_tracing:
+                    tracemalloc.stop()
+                try:
+                    path = self.write(feed_name, cycle, profiler, snapshot, peak, elapsed)
+                    print(f"[{feed_name}] Profiled cycle {cycle}: {elapsed:.2f} s, "
+                          f"peak {peak / 1048576:.1f} MiB -> {path}")
+                except OSError as e:
+                    print(f"[{feed_name}] Could not write profile: {e}")
+
+    def write(self, feed_name: str, cycle: int, profiler: cProfile.Profile, snapshot: tracemalloc.Snapshot,
+              peak: int, elapsed: float) -> str:
+        os.makedirs(self.directory, exist_ok=True)
+        safe_name = re.sub(r"[^\w.-]", "_", feed_name)
+        base = os.path.join(self.directory, f"{safe_name}-{cycle}")
+        profiler.dump_stats(base + ".pstats")
+        snapshot.dump(base + ".tracemalloc")
+        with open(base + ".collapsed", "w", encoding="utf-8") as f:
+            f.writelines(line + "\n" for line in collapsed_stacks(pstats.Stats(profiler)))
+
+        with open(base + ".txt", "w", encoding="utf-8") as f:
+            f.write(f"feed {feed_name}, cycle {cycle}\n")
+            f.write(f"wall time {elapsed:.3f} s, peak traced memory {peak / 1024:,.0f} KiB\n\n")
+            stats = pstats.Stats(profiler, stream=f).strip_dirs()
+            f.write(f"=== top {TOP_FUNCTIONS} by cumulative time ===\n")
+            stats.sort_stats(pstats.SortKey.CUMULATIVE).print_stats(TOP_FUNCTIONS)
+            f.write(f"=== top {TOP_FUNCTIONS} by own time ===\n")
+            stats.sort_stats(pstats.SortKey.TIME).print_stats(TOP_FUNCTIONS)
+            f.write(f"=== top {TOP_ALLOCATIONS} allocation sites still alive at the end of the cycle ===\n")
+            for stat in snapshot.statistics("lineno")[:TOP_ALLOCATIONS]:
+                f.write(f"{stat}\n")
+        return base + ".txt"
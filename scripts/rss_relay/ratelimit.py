@@ -0,0 +1,119 @@
+#!/usr/bin/python3
+# -*- coding: utf-8 -*-
+
+import asyncio
+import time
+
+
+def _float_header(headers, name: str) -> float | None:
+    value = headers.get(name)
+    try:
+        return float(value) if value is not None else None
+    except ValueError:
+        return None
+
+
+class WebhookBucket:
+    """
+    Token bucket for one webhook, refilled from the platform's own headers.
+
+    Until the first response the bucket lets requests through. Afterwards
+    X-RateLimit-Remaining says how many tokens are left and
+    X-RateLimit-Reset-After (or X-RateLimit-Reset) when they come back. Each
+    request takes a token; when none are left, acquire() waits for the reset.
+    """
+
+    def __init__(self):
+        self.remaining: int | None = None
+        self.limit: int | None = None
+        self.reset_at = 0.0  # time.monotonic() of the next refill
+        self.blocked_until = 0.0  # set by 429 responses
+        self._lock = asyncio.Lock()
+
+    async def acquire(self, registry: "RateLimiter") -> None:
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                wait = max(self.blocked_until, registry.global_blocked_until) - now
+                if wait <= 0 and self.remaining == 0:
+                    if now < self.reset_at:
+                        wait = self.reset_at - now
+                    else:
+                        # Window has passed; assume a full bucket until headers say otherwise
+                        self.remaining = self.limit
+                if wait <= 0:
+                    break
+                await asyncio.sleep(wait)
+            if self.remaining is not None and self.remaining > 0:
+                self.remaining -= 1
+
+    def update(self, headers) -> None:
+        """
+        Refresh the bucket from X-RateLimit-* response headers, if present.
+        """
+        remaining = _float_header(headers, "X-RateLimit-Remaining")
+        if remaining is None:
+            return
+        self.remaining = int(remaining)
+        limit = _float_header(headers, "X-RateLimit-Limit")
+        if limit is not None:
+            self.limit = int(limit)
+        reset_after = _float_header(headers, "X-RateLimit-Reset-After")
+        if reset_after is None:
+            reset = _float_header(headers, "X-RateLimit-Reset")
+            if reset is not None:
+                reset_after = max(0.0, reset - time.time())
+        if reset_after is not None:
+            self.reset_at = time.monotonic() + reset_after
+
+    def block(self, retry_after: float) -> None:
+        self.remaining = 0
+        self.blocked_until = max(self.blocked_until, time.monotonic() + retry_after)
+
+
+class RateLimiter:
+    """
+    One WebhookBucket per webhook URL, plus the global pause Discord asks
+    for with X-RateLimit-Global.
+    """
+
+    DEFAULT_RETRY_AFTER = 1.0
+
+    def __init__(self):
+        self._buckets: dict[str, WebhookBucket] = {}
+        self.global_blocked_until = 0.0
+        self.hits = 0  # 429 responses seen
+
+    def bucket(self, webhook_url: str) -> WebhookBucket:
+        if webhook_url not in self._buckets:
+            self._buckets[webhook_url] = WebhookBucket()
+        return self._buckets[webhook_url]
+
+    async def acquire(self, webhook_url: str) -> None:
+        await self.bucket(webhook_url).acquire(self)
+
+    def update(self, webhook_url: str, headers) -> None:
+        self.bucket(webhook_url).update(headers)
+
+    def rate_limited(self, webhook_url: str, headers, body: dict | None) -> float:
+        """
+        Record a 429. The delay comes from the JSON retry_after (Discord) or the
+        Retry-After header (Discord and Guilded). Returns the delay in seconds.
+        """
+        self.hits += 1
+        retry_after = None
+        if isinstance(body, dict):
+            try:
+                retry_after = float(body.get("retry_after"))
+            except (TypeError, ValueError):
+                retry_after = None
+        if retry_after is None:
+            retry_after = _float_header(headers, "Retry-After")
+        if retry_after is None:
+            retry_after = self.DEFAULT_RETRY_AFTER
+
+        is_global = (isinstance(body, dict) and body.get("global")) or headers.get("X-RateLimit-Global") == "true"
+        if is_global:
+            self.global_blocked_until = max(self.global_blocked_until, time.monotonic() + retry_after)
+        self.bucket(webhook_url).block(retry_after)
+        return retry_after
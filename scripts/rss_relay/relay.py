@@ -0,0 +1,396 @@
+#!/usr/bin/python3
+# -*- coding: utf-8 -*-
+
+import asyncio
+import os
+import time
+
+from .config import (CURSOR_FILE, DEDUP_DB_FILE, OUTBOX_FILE, SCHEDULE_FILE, THUMBNAIL_FILE, VALIDATOR_CACHE_FILE,
+                     FeedConfig, RelaySettings, Sink)
+from .cursor import CursorStore
+from .dates import DateNormalizer, get_timezone
+from .delivery import DeliveryExecutor
+from .dedup import DedupDatabase, HashIndexStore, TextDedupStore
+from .fetch import FeedFetcher, ValidatorCache
+from .filters import KeywordFilter, Rule, parse_rule
+from .metrics import RelayMetrics, serve_metrics, textfile_writer, write_textfile
+from .outbox import Outbox
+from .parse import FeedParserPool
+from .pipeline import EntryPipeline, format_counts
+from .ratelimit import RateLimiter
+from .scheduler import FeedSchedule, ScheduleStore
+from .stream import StreamingFeedParser
+from .thumbnails import ThumbnailResolver
+from .webhooks import DeliveryJob
+
+class FeedState:
+    """
+    Per-feed runtime state: one dedup store of delivered keys per sink, plus
+    the outbox, which holds keys discovered but not yet delivered.
+    """
+
+    def __init__(self, feed: FeedConfig, open_store, outbox: Outbox, schedule: FeedSchedule,
+                 metrics: RelayMetrics | None = None):
+        self.feed = feed
+        self.schedule = schedule
+        self._open_store = open_store
+        self._processed: dict[str, object] = {}
+        self.outbox = outbox
+        self.local_tz = get_timezone(feed.local_timezone)
+        # Remembers which date format this feed uses across polls
+        self.dates = DateNormalizer(feed.rss_timezone)
+        # skip_keywords are plain, case-sensitive title exclusions
+        keyword_filter = KeywordFilter(
+            [parse_rule(line) for line in feed.include],
+            [Rule("title", keyword) for keyword in feed.skip_keywords] + [parse_rule(line) for line in feed.exclude],
+        )
+        self.pipeline = EntryPipeline(feed, keyword_filter, self.pending_sinks, self.local_tz, metrics)
+
+    def processed(self, sink: Sink):
+        # Opened on first use so an unchanged (304) feed never touches its dedup state
+        if sink.name not in self._processed:
+            self._processed[sink.name] = self._open_store(sink)
+        return self._processed[sink.name]
+
+    def sink(self, name: str) -> Sink:
+        for sink in self.feed.sinks:
+            if sink.name == name:
+                return sink
+        # Jobs queued before a feed had named sinks belong to its first sink
+        return self.feed.sinks[0]
+
+    def close(self) -> None:
+        for store in self._processed.values():
+            store.close()
+
+    def pending_sinks(self, key: str) -> list[Sink]:
+        return [sink for sink in self.feed.sinks
+                if key not in self.processed(sink)
+                and not self.outbox.contains(self.feed.name, key, sink.webhook_url)]
+
+    def is_known(self, key: str) -> bool:
+        return not self.pending_sinks(key)
+
+
+class Relay:
+    """
+    One process for every configured feed.
+
+    Stages:
+        poller (one per feed) -> fetch_queue -> filter workers -> outbox
+        outbox -> dispatcher -> delivery executor (one ordered lane per webhook)
+    The queues are bounded, so memory stays bounded. New entries are written
+    to the durable outbox, which decouples discovery from delivery: a slow or
+    failing webhook only grows the outbox on disk and never stalls fetching.
+    """
+
+    def __init__(self, settings: RelaySettings, feeds: list[FeedConfig], profiler=None):
+        self.settings = settings
+        self.feeds = feeds
+        self.profiler = profiler  # a CycleProfiler with --profile
+        self.metrics = RelayMetrics()
+        self.metrics.registry.collectors.append(self.collect_depths)
+        self.dedup_db: DedupDatabase | None = None
+        if settings.dedup_backend == "sqlite":
+            self.dedup_db = DedupDatabase(os.path.join(settings.state_dir, DEDUP_DB_FILE),
+                                          ttl_days=settings.dedup_ttl_days)
+        self.outbox = Outbox(os.path.join(settings.state_dir, OUTBOX_FILE),
+                             max_attempts=settings.delivery_max_attempts,
+                             base_delay=settings.retry_base_delay, max_delay=settings.retry_max_delay)
+        self.schedules = ScheduleStore(os.path.join(settings.state_dir, SCHEDULE_FILE))
+        self.states = {
+            feed.name: FeedState(feed, self.open_store, self.outbox,
+                                 self.schedules.schedule(feed.name, feed.poll_interval,
+                                                         feed.min_poll_interval, feed.max_poll_interval),
+                                 self.metrics)
+            for feed in feeds
+        }
+        self.validators = ValidatorCache(os.path.join(settings.state_dir, VALIDATOR_CACHE_FILE))
+        self.fetcher = FeedFetcher(self.validators, limit_per_host=settings.fetch_limit_per_host)
+        self.parser = FeedParserPool(settings.parse_processes)
+        self.cursors = CursorStore(os.path.join(settings.state_dir, CURSOR_FILE))
+        self.thumbnails = ThumbnailResolver(os.path.join(settings.state_dir, THUMBNAIL_FILE),
+                                            concurrency=settings.fetch_limit_per_host)
+        self.limiter = RateLimiter()
+        self.fetch_queue: asyncio.Queue = asyncio.Queue(maxsize=settings.fetch_queue_size)
+        self.executor = DeliveryExecutor(self.limiter, self.finish_job,
+                                         concurrency=settings.delivery_workers,
+                                         capacity=settings.delivery_queue_size)
+        self.in_flight: set[int] = set()  # outbox ids handed to the executor
+        self.posted: set[int] = set()  # outbox ids posted whose row could not be removed
+        self.wakeup = asyncio.Event()
+
+    def open_store(self, sink: Sink):
+        if self.dedup_db is not None:
+            # The legacy processed_entries file seeds an empty namespace
+            return self.dedup_db.store(sink.namespace, import_from=sink.state_file)
+        if self.settings.dedup_backend == "hashindex":
+            return HashIndexStore(os.path.join(self.settings.state_dir, f"{sink.namespace}.idx"),
+                                  import_from=sink.state_file)
+        return TextDedupStore(sink.state_file)
+
+    # ------------------ fetch ------------------
+
+    async def fetch_feed(self, feed: FeedConfig, inline_parse: bool = False) -> tuple | None:
+        """
+        Fetch and parse the feed. Returns (parsed, validators), or None when it
+        is unchanged or failed. inline_parse parses on the event loop instead
+        of the parser pool.
+        """
+        cursor = self.cursors.get(feed.name)
+        state = self.states[feed.name]
+        stream_parser = None
+        if feed.parser == "stream":
+            stream_parser = StreamingFeedParser(cursor, is_known=state.is_known, dates=state.dates)
+        metrics = self.metrics
+        start = time.perf_counter()
+        try:
+            result = await self.fetcher.fetch(feed.name, feed.rss_feed_url,
+                                              consumer=stream_parser.feed if stream_parser else None)
+        except Exception as e:
+            metrics.fetches.inc(feed=feed.name, status="error")
+            print(f"[{feed.name}] Fetch failed: {e}")
+            state.schedule.record_error()
+            return None
+        # With the streaming parser this includes parsing, which overlaps the download
+        metrics.fetch_seconds.observe(time.perf_counter() - start, feed=feed.name)
+        metrics.fetches.inc(feed=feed.name, status=str(result.status))
+        metrics.fetch_bytes.inc(len(result.body), feed=feed.name)
+        if result.not_modified:
+            state.schedule.record_unchanged()
+            return None
+        start = time.perf_counter()
+        try:
+            parsed = stream_parser.close() if stream_parser else None
+            if parsed is None or stream_parser.failed:
+                if stream_parser:
+                    print(f"[{feed.name}] Streaming parser could not read the feed; falling back to feedparser")
+                # Only the downloaded bytes go to the parser, never the URL
+                parsed = await self.parser.parse(result.body, cursor, feed.rss_timezone, state.dates.preferred,
+                                                 inline=inline_parse)
+        except Exception as e:
+            print(f"[{feed.name}] Parse failed: {e}")
+            state.schedule.record_error()
+            return None
+        metrics.parse_seconds.observe(time.perf_counter() - start, feed=feed.name)
+        if state.schedule.record_poll(parsed.published):
+            self.schedules.update(feed.name, state.schedule)
+        state.dates.preferred = parsed.date_format or state.dates.preferred
+        if not parsed.newest_first:
+            self.cursors.mark_unordered(feed.name)
+        return parsed, (result.etag, result.last_modified)
+
+    async def poll_once(self, feed: FeedConfig) -> None:
+        item = await self.fetch_feed(feed)
+        if item is not None:
+            await self.fetch_queue.put((feed, *item))
+
+    async def profile_cycle(self, feed: FeedConfig, deliver: bool = False) -> None:
+        """
+        One poll of the feed under the profiler. The document is filtered right
+        away instead of going through the fetch queue, and with deliver=True its
+        deliveries are awaited too, so the whole cycle lands in one profile.
+        """
+        async with self.profiler.profile(feed.name):
+            # cProfile only sees the event loop thread, so parsing and rendering run there
+            item = await self.fetch_feed(feed, inline_parse=True)
+            if item is not None:
+                await self.filter_document(feed, *item, inline=True)
+            if deliver:
+                await self.dispatcher(drain=True)
+
+    async def poller(self, feed: FeedConfig) -> None:
+        schedule = self.states[feed.name].schedule
+        await asyncio.sleep(schedule.first_delay())
+        while True:
+            if self.profiler is not None and self.profiler.wants(feed.name):
+                await self.profile_cycle(feed)
+            else:
+                await self.poll_once(feed)
+            await asyncio.sleep(schedule.next_delay())
+
+    # ------------------ filter ------------------
+
+    async def filter_document(self, feed: FeedConfig, parsed, validators: tuple, inline: bool = False) -> None:
+        try:
+            jobs, counts = await self.states[feed.name].pipeline.run(parsed.entries, inline=inline)
+            for stage, count in counts.items():
+                self.metrics.entries.inc(count, feed=feed.name, stage=stage)
+            if feed.og_image:
+                await self.thumbnails.fill(self.fetcher.session, jobs)
+            # Oldest first, so rows published at the same time keep the feed's order
+            for job in sorted(reversed(jobs) if parsed.newest_first else jobs, key=lambda job: job.timestamp):
+                self.outbox.enqueue(job)
+            if counts["seen"]:
+                print(f"[{feed.name}] {format_counts(counts)}")
+            self.wakeup.set()
+            # Everything new is in the outbox now, so the document counts as handled
+            if parsed.newest_first and parsed.newest is not None:
+                self.cursors.set(feed.name, parsed.newest)
+            self.validators.update(feed.name, *validators)
+        except Exception as e:
+            print(f"[{feed.name}] Filtering failed: {e}")
+
+    async def filter_worker(self) -> None:
+        while True:
+            feed, parsed, validators = await self.fetch_queue.get()
+            try:
+                await self.filter_document(feed, parsed, validators)
+            finally:
+                self.fetch_queue.task_done()
+
+    # ------------------ deliver ------------------
+
+    async def dispatcher(self, drain: bool = False) -> None:
+        """
+        Move due outbox jobs into the delivery queue. With drain=True, return
+        once nothing is due and nothing is in flight (cron mode); jobs waiting
+        for a retry stay in the outbox for the next run.
+        """
+        while True:
+            self.wakeup.clear()
+            free = self.executor.free
+            jobs = self.outbox.due(free, self.in_flight | self.posted) if free > 0 else []
+            for job in jobs:
+                state = self.states.get(job.feed_name)
+                if state is None:
+                    # Left behind by a feed section that was removed or renamed
+                    self.outbox.dead_letter(job.id, f"feed [{job.feed_name}] is no longer configured")
+                    print(f"[{job.feed_name}] Feed no longer configured; moved '{job.title}' to dead-letter")
+                    continue
+                if job.key in state.processed(state.sink(job.sink)):
+                    # Posted and recorded, but the process stopped before the row was removed
+                    self.outbox.delivered(job.id)
+                    continue
+                self.in_flight.add(job.id)
+                self.executor.submit(job)
+            if jobs:
+                continue
+            if drain and not self.in_flight:
+                return
+            next_due = self.outbox.next_due_in()
+            timeout = 60.0 if next_due is None else min(60.0, max(next_due, 0.1))
+            try:
+                await asyncio.wait_for(self.wakeup.wait(), timeout)
+            except asyncio.TimeoutError:
+                pass
+
+    def finish_job(self, job: DeliveryJob, error: Exception | None, seconds: float = 0.0) -> None:
+        try:
+            state = self.states[job.feed_name]
+            sink = state.sink(job.sink)
+            self.metrics.delivery_seconds.observe(seconds, feed=job.feed_name, sink=sink.name)
+            if error is None:
+                result = "ok"
+                # Whatever fails below, this row is never handed out again:
+                # it would be posted again right away
+                self.posted.add(job.id)
+                try:
+                    # Commit the key before the outbox row goes, so a crash in
+                    # between can never lose track of a posted entry
+                    store = state.processed(sink)
+                    store.add(job.key)
+                    store.flush()
+                except Exception as e:
+                    print(f"[{job.feed_name}] Posted '{job.title}' but could not record its key {job.key}: {e}")
+                self.outbox.delivered(job.id)
+                self.posted.discard(job.id)
+                print(f"[{job.feed_name}] Posted: {job.title}")
+            elif self.outbox.failed(job.id, str(error)):
+                result = "dead"
+                print(f"[{job.feed_name}] Giving up on '{job.title}' (moved to dead-letter): {error}")
+            else:
+                result = "retry"
+                print(f"[{job.feed_name}] Failed to post '{job.title}', will retry: {error}")
+            self.metrics.deliveries.inc(feed=job.feed_name, sink=sink.name, result=result)
+        finally:
+            # Always release the job, or a --once run would wait for it forever
+            self.in_flight.discard(job.id)
+            self.wakeup.set()
+
+    # ------------------ metrics ------------------
+
+    def collect_depths(self) -> None:
+        """
+        Refresh the queue gauges right before the metrics are rendered.
+        """
+        depth = self.metrics.queue_depth
+        depth.set(self.fetch_queue.qsize(), queue="fetch")
+        depth.set(self.executor.pending, queue="executor")
+        counts = self.outbox.counts()
+        depth.set(counts.get("pending", 0), queue="outbox")
+        depth.set(counts.get("dead", 0), queue="dead")
+        self.metrics.rate_limited.set_total(self.limiter.hits)
+
+    async def start_metrics(self) -> list:
+        """
+        Start the /metrics endpoint and the textfile writer, when configured.
+        Returns what stop_metrics() has to tear down.
+        """
+        settings = self.settings
+        handles = []
+        if settings.metrics_port:
+            handles.append(await serve_metrics(self.metrics, settings.metrics_host, settings.metrics_port))
+        if settings.metrics_textfile:
+            handles.append(asyncio.create_task(
+                textfile_writer(self.metrics, settings.metrics_textfile, settings.metrics_interval)))
+        return handles
+
+    async def stop_metrics(self, handles: list) -> None:
+        for handle in handles:
+            if isinstance(handle, asyncio.Task):
+                handle.cancel()
+                await asyncio.gather(handle, return_exceptions=True)
+            else:
+                await handle.cleanup()
+        if self.settings.metrics_textfile:
+            # A last snapshot, so cron (--once) runs leave complete numbers behind
+            try:
+                write_textfile(self.metrics, self.settings.metrics_textfile)
+            except OSError as e:
+                print(f"Could not write metrics to {self.settings.metrics_textfile}: {e}")
+
+    # ------------------ lifecycle ------------------
+
+    async def run(self, once: bool = False) -> None:
+        """
+        Run the relay. With once=True every feed is polled a single time and the
+        call returns when every due delivery has been attempted (cron mode).
+        With a profiler, once=True polls the feeds one after another instead,
+        for profiler.cycles passes.
+        """
+        async with self.fetcher:
+            metrics_handles = await self.start_metrics()
+            workers = [asyncio.create_task(self.filter_worker())
+                       for _ in range(self.settings.filter_workers)]
+            try:
+                if once and self.profiler is not None:
+                    # One feed at a time, so every profile holds a single feed's cycle
+                    for _ in range(max(self.profiler.cycles, 1)):
+                        for feed in self.feeds:
+                            await self.profile_cycle(feed, deliver=True)
+                elif once:
+                    await asyncio.gather(*(self.poll_once(feed) for feed in self.feeds))
+                    await self.fetch_queue.join()
+                    await self.dispatcher(drain=True)
+                else:
+                    await asyncio.gather(self.dispatcher(), *(self.poller(feed) for feed in self.feeds))
+            finally:
+                for worker in workers:
+                    worker.cancel()
+                await asyncio.gather(*workers, return_exceptions=True)
+                await self.stop_metrics(metrics_handles)
+                await self.close()
+
+    async def close(self) -> None:
+        """
+        Stop the delivery executor and close every store.
+        """
+        await self.executor.close()
+        for state in self.states.values():
+            state.close()
+        if self.dedup_db is not None:
+            self.dedup_db.close()
+        self.outbox.close()
+        self.thumbnails.close()
+        self.parser.close()
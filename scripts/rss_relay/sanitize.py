@@ -0,0 +1,209 @@
+#!/usr/bin/python3
+# -*- coding: utf-8 -*-
+
+from html.parser import HTMLParser
+
+MAX_EMBED_DESC = 4000  # Discord limit for embed.description is 4096; keep a buffer
+
+# Tags without content or end tag (BeautifulSoup's html.parser list)
+VOID_TAGS = frozenset(("area", "base", "basefont", "bgsound", "br", "col", "command", "embed", "frame", "hr",
+                       "image", "img", "input", "isindex", "keygen", "link", "menuitem", "meta", "nextid",
+                       "param", "source", "spacer", "track", "wbr"))
+# Tags whose text is never shown (get_text() leaves it out too)
+HIDDEN_TAGS = frozenset(("script", "style", "template", "rt", "rp"))
+# Tags that start a new line in markdown output
+BLOCK_TAGS = frozenset(("p", "div", "br", "li", "ul", "ol", "blockquote", "tr",
+                        "h1", "h2", "h3", "h4", "h5", "h6", "hr"))
+MARKDOWN_WRAP = {"b": "**", "strong": "**", "i": "*", "em": "*"}
+
+
+class _Truncated(Exception):
+    pass
+
+
+class DescriptionSanitizer(HTMLParser):
+    """
+    Single-pass replacement for the BeautifulSoup cleaning of descriptions.
+
+    Open elements are tracked like the tree BeautifulSoup builds: an end tag
+    closes every element opened after its start tag, and stray end tags are
+    ignored. Tags in strip_tags are dropped together with everything inside
+    them (like Tag.decompose()); all other markup is reduced to text. For
+    well-formed input, text mode gives the same result as
+    soup.get_text(separator="\\n", strip=True); markdown mode keeps links,
+    bold, italics and line breaks. Parsing stops as soon as the output is
+    longer than max_length.
+    """
+
+    def __init__(self, strip_tags, markdown: bool = False, max_length: int = MAX_EMBED_DESC):
+        super().__init__(convert_charrefs=True)
+        self.strip_tags = frozenset(tag.lower() for tag in strip_tags) | HIDDEN_TAGS
+        self.markdown = markdown
+        self.max_length = max_length
+        self._pieces: list[str] = []
+        self._length = 0
+        self._data: list[str] = []  # text of the current string, which HTMLParser may split
+        self._open: list[tuple[str, str | None]] = []  # open elements and the markdown that closes them
+        self._skip_at: int | None = None  # index in _open of the dropped element being skipped
+        self._closed_void: list[str] = []  # void elements whose end tag, if any, is ignored
+
+    # ------------------ output ------------------
+
+    def _emit(self, text: str) -> None:
+        self._pieces.append(text)
+        self._length += len(text) + (0 if self.markdown else 1)
+        if self._length > self.max_length + 1:
+            raise _Truncated
+
+    def _newline(self) -> None:
+        if self._pieces and not self._pieces[-1].endswith("\n"):
+            self._emit("\n")
+
+    def _flush(self) -> None:
+        """
+        Emit the text collected since the last tag, comment or declaration.
+        """
+        if not self._data:
+            return
+        data = "".join(self._data)
+        self._data.clear()
+        if self.markdown:
+            text = " ".join(data.split())
+            if text:
+                if data[:1].isspace() and self._pieces and not self._pieces[-1].endswith(("\n", " ")):
+                    text = " " + text
+                if data[-1:].isspace():
+                    text += " "
+                self._emit(text)
+            elif self._pieces and not self._pieces[-1].endswith(("\n", " ")):
+                # Whitespace between inline elements still separates them
+                self._emit(" ")
+        else:
+            text = data.strip()
+            if text:
+                self._emit(text)
+
+    # ------------------ element stack ------------------
+
+    def _markdown_open(self, tag: str, attrs, empty: bool) -> str | None:
+        """
+        Emit the markdown that opens an element; returns what closes it.
+        """
+        if tag in BLOCK_TAGS:
+            self._newline()
+            if tag == "li" and not empty:
+                self._emit("- ")
+            return "\n"
+        if empty:
+            return None
+        if tag in MARKDOWN_WRAP:
+            self._emit(MARKDOWN_WRAP[tag])
+            return MARKDOWN_WRAP[tag]
+        if tag == "a":
+            href = dict(attrs).get("href")
+            if href:
+                self._emit("[")
+                return f"]({href})"
+        return None
+
+    def _push(self, tag: str, attrs, empty: bool = False) -> None:
+        close = None
+        if self._skip_at is None:
+            if tag in self.strip_tags:
+                self._skip_at = len(self._open)
+            elif self.markdown:
+                close = self._markdown_open(tag, attrs, empty)
+        self._open.append((tag, close))
+
+    def _pop_to(self, tag: str) -> None:
+        """
+        Close the innermost open `tag` and every element opened inside it;
+        an end tag without an open element is ignored.
+        """
+        if all(open_tag != tag for open_tag, _ in self._open):
+            return
+        while True:
+            open_tag, close = self._open.pop()
+            if self._skip_at is not None:
+                if len(self._open) == self._skip_at:
+                    self._skip_at = None
+            elif close == "\n":
+                self._newline()
+            elif close:
+                self._emit(close)
+            if open_tag == tag:
+                return
+
+    # ------------------ parser callbacks ------------------
+
+    def handle_starttag(self, tag, attrs):
+        self._flush()
+        self._push(tag, attrs)
+        if tag in VOID_TAGS:
+            self._pop_to(tag)
+            self._closed_void.append(tag)
+
+    def handle_startendtag(self, tag, attrs):
+        self._flush()
+        self._push(tag, attrs, empty=True)
+        self._pop_to(tag)
+
+    def handle_endtag(self, tag):
+        if tag in self._closed_void:
+            # </br> after <br>: already closed, and not even a break in the text
+            self._closed_void.remove(tag)
+            return
+        self._flush()
+        self._pop_to(tag)
+
+    def handle_data(self, data):
+        if self._skip_at is None:
+            self._data.append(data)
+
+    def handle_comment(self, data):
+        self._flush()
+
+    def handle_decl(self, decl):
+        self._flush()
+
+    def handle_pi(self, data):
+        self._flush()
+
+    def unknown_decl(self, data):
+        self._flush()
+        if data.startswith("CDATA[") and self._skip_at is None:
+            # BeautifulSoup keeps a CDATA section as a string of its own
+            self._data.append(data[len("CDATA["):])
+            self._flush()
+
+    # ------------------ entry point ------------------
+
+    def sanitize(self, html: str) -> str:
+        try:
+            self.feed(html or "")
+            self.close()
+            self._flush()
+            while self._open:
+                # Elements left open at the end still close their markdown
+                self._pop_to(self._open[-1][0])
+        except _Truncated:
+            pass
+        if self.markdown:
+            text = "".join(self._pieces)
+            text = "\n".join(line.strip() for line in text.splitlines())
+            while "\n\n\n" in text:
+                text = text.replace("\n\n\n", "\n\n")
+            text = text.strip()
+        else:
+            text = "\n".join(self._pieces)
+        if len(text) > self.max_length:
+            return text[:self.max_length - 20] + "…"
+        return text
+
+
+def sanitize_description(html: str, strip_tags, markdown: bool = False, max_length: int = MAX_EMBED_DESC) -> str:
+    """
+    Remove the configured tags, reduce the rest of the HTML to text (or
+    markdown), and trim to embed limits.
+    """
+    return DescriptionSanitizer(strip_tags, markdown, max_length).sanitize(html)
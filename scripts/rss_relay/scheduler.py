@@ -0,0 +1,198 @@
+#!/usr/bin/python3
+# -*- coding: utf-8 -*-
+
+import json
+import os
+import random
+import statistics
+import time
+
+HISTORY_SIZE = 64  # publish times remembered per feed, for the cadence
+WEEK = 7 * 24 * 3600
+HOUR = 3600
+WINDOW_WEEKS = 8  # weeks of publish counts kept per hour-of-week
+WINDOW_HITS = 2  # different weeks with a publish in the same hour-of-week that make it a release window
+WINDOW_FACTOR = 3  # ...if it also gets this many times the publishes of the feed's average hour
+WINDOW_LEAD = 600  # start polling fast this many seconds before a window
+CADENCE_DIVISOR = 4  # poll this many times per typical gap between publishes
+IDLE_BACKOFF = 1.5
+JITTER = 0.1
+
+
+def hour_of_week(timestamp: float) -> int:
+    # Epoch day 0 was a Thursday; the offset only needs to be consistent
+    return int(timestamp // HOUR) % (WEEK // HOUR)
+
+
+class FeedSchedule:
+    """
+    Decides how long a feed's poller sleeps before the next poll.
+
+    The feed's publish times teach it two things: the typical gap between
+    entries (the normal interval is a fraction of it, between min_interval and
+    max_interval, learned from the last HISTORY_SIZE entries) and which hours
+    of the week entries tend to appear in (simulcast slots, learned from
+    publish counts per hour-of-week over the last WINDOW_WEEKS weeks). Inside
+    or just before such a window the feed is polled at min_interval, and a
+    long sleep is cut short when a window is about to open. Polls that find
+    nothing new back off, errors back off exponentially, and every delay gets
+    a little jitter so feeds drift apart.
+    """
+
+    def __init__(self, poll_interval: float, min_interval: float, max_interval: float,
+                 history: list[float] | None = None, slots: dict[int, dict[int, int]] | None = None):
+        self.poll_interval = poll_interval
+        self.min_interval = min(min_interval, poll_interval)
+        self.max_interval = max(max_interval, poll_interval)
+        self.history: list[float] = sorted(history or [])[-HISTORY_SIZE:]
+        # hour-of-week -> {week number: publishes in that hour of that week}
+        self.slots: dict[int, dict[int, int]] = {}
+        if slots is None:
+            # schedule.json from before the slots were kept
+            self._count(self.history)
+        else:
+            self.slots = slots
+        self.idle_polls = 0
+        self.errors = 0
+
+    def record_poll(self, timestamps) -> bool:
+        """
+        Learn from the publish times in a fetched document. Returns True if
+        anything newer than what was seen before turned up.
+        """
+        newest = self.history[-1] if self.history else 0.0
+        fresh = sorted({t for t in timestamps if t is not None and t > newest})
+        self.errors = 0
+        if not fresh:
+            self.idle_polls += 1
+            return False
+        self.idle_polls = 0
+        self.history = (self.history + fresh)[-HISTORY_SIZE:]
+        self._count(fresh)
+        return True
+
+    def _count(self, timestamps) -> None:
+        """
+        Add publish times to the hour-of-week counts and forget weeks older
+        than WINDOW_WEEKS before the newest one.
+        """
+        if not timestamps:
+            return
+        for t in timestamps:
+            weeks = self.slots.setdefault(hour_of_week(t), {})
+            week = int(t // WEEK)
+            weeks[week] = weeks.get(week, 0) + 1
+        oldest = int(max(timestamps) // WEEK) - WINDOW_WEEKS + 1
+        for hour, weeks in list(self.slots.items()):
+            kept = {week: count for week, count in weeks.items() if week >= oldest}
+            if kept:
+                self.slots[hour] = kept
+            else:
+                del self.slots[hour]
+
+    def record_unchanged(self) -> None:
+        self.errors = 0
+        self.idle_polls += 1
+
+    def record_error(self) -> None:
+        self.errors += 1
+
+    def cadence(self) -> float:
+        """
+        Normal interval from the median gap between publishes.
+        """
+        if len(self.history) < 4:
+            return self.poll_interval
+        gaps = [b - a for a, b in zip(self.history, self.history[1:]) if b > a]
+        if not gaps:
+            return self.poll_interval
+        return min(max(statistics.median(gaps) / CADENCE_DIVISOR, self.min_interval), self.max_interval)
+
+    def windows(self) -> set[int]:
+        """
+        Hours of the week that had publishes in WINDOW_HITS different weeks (a
+        burst in one hour is one release, not a weekly slot) and clearly more
+        than the feed's average hour, so a feed busy around the clock has none.
+        """
+        total = sum(count for weeks in self.slots.values() for count in weeks.values())
+        busy = WINDOW_FACTOR * total / (WEEK // HOUR)
+        return {hour for hour, weeks in self.slots.items()
+                if len(weeks) >= WINDOW_HITS and sum(weeks.values()) >= busy}
+
+    def until_window(self, now: float, windows: set[int]) -> float | None:
+        """
+        Seconds until the next release window starts (0 inside one).
+        """
+        if not windows:
+            return None
+        if hour_of_week(now + WINDOW_LEAD) in windows or hour_of_week(now) in windows:
+            return 0.0
+        next_hour = (now // HOUR + 1) * HOUR
+        for step in range(WEEK // HOUR):
+            start = next_hour + step * HOUR
+            if hour_of_week(start) in windows:
+                return max(start - WINDOW_LEAD - now, 0.0)
+        return None
+
+    def next_delay(self, now: float | None = None) -> float:
+        now = time.time() if now is None else now
+        if self.errors:
+            delay = min(self.poll_interval * 2 ** self.errors, self.max_interval)
+        else:
+            delay = min(self.cadence() * IDLE_BACKOFF ** self.idle_polls, self.max_interval)
+            until = self.until_window(now, self.windows())
+            if until == 0.0:
+                delay = self.min_interval
+            elif until is not None:
+                delay = min(delay, max(until, self.min_interval))
+        return delay * random.uniform(1 - JITTER, 1 + JITTER)
+
+    def first_delay(self) -> float:
+        """
+        Random start offset so feeds don't all poll in the same second.
+        """
+        return random.uniform(0, self.min_interval)
+
+
+class ScheduleStore:
+    """
+    Publish-time history and hour-of-week counts per feed in schedule.json,
+    so the learned cadence and release windows survive restarts.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        data = self._load()
+        self._history: dict[str, list[float]] = data.get("history", {})
+        # JSON object keys are strings
+        self._slots: dict[str, dict[int, dict[int, int]]] = {
+            feed_name: {int(hour): {int(week): count for week, count in weeks.items()}
+                        for hour, weeks in slots.items()}
+            for feed_name, slots in data.get("slots", {}).items()
+        }
+
+    def _load(self) -> dict:
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                return json.load(f)
+        except (FileNotFoundError, ValueError):
+            return {}
+
+    def schedule(self, feed_name: str, poll_interval: float, min_interval: float,
+                 max_interval: float) -> FeedSchedule:
+        return FeedSchedule(poll_interval, min_interval, max_interval, self._history.get(feed_name),
+                            self._slots.get(feed_name))
+
+    def update(self, feed_name: str, schedule: FeedSchedule) -> None:
+        self._history[feed_name] = schedule.history
+        self._slots[feed_name] = schedule.slots
+        self.save()
+
+    def save(self) -> None:
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        tmp_path = self.path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump({"history": self._history, "slots": self._slots}, f, indent=2, sort_keys=True)
+        os.replace(tmp_path, self.path)
@@ -0,0 +1,114 @@
+#!/usr/bin/python3
+# -*- coding: utf-8 -*-
+
+import sys
+import time
+
+TOP_IMPORTS = 15
+
+
+class _TimedLoader:
+    """
+    Wraps a module loader so the time spent running the module body is recorded.
+    """
+
+    def __init__(self, loader, timer: "ImportTimer", name: str):
+        self._loader = loader
+        self._timer = timer
+        self._name = name
+
+    def __getattr__(self, attr):
+        return getattr(self._loader, attr)
+
+    def create_module(self, spec):
+        return self._loader.create_module(spec)
+
+    def exec_module(self, module) -> None:
+        self._timer.enter()
+        try:
+            self._loader.exec_module(module)
+        finally:
+            self._timer.leave(self._name)
+            # Put the real loader back so nothing else ever sees the wrapper
+            module.__loader__ = self._loader
+            if getattr(module, "__spec__", None) is not None:
+                module.__spec__.loader = self._loader
+
+
+class ImportTimer:
+    """
+    Meta path finder that times every import made while it is installed,
+    like `python -X importtime`: self time excludes the imports a module
+    makes itself, cumulative time includes them.
+    """
+
+    def __init__(self):
+        self.records: list[tuple[str, int, float, float]] = []  # (module, depth, self, cumulative)
+        self._stack: list[list[float]] = []  # [start, time spent in nested imports]
+
+    def find_spec(self, name, path=None, target=None):
+        for finder in sys.meta_path:
+            if finder is self or not hasattr(finder, "find_spec"):
+                continue
+            spec = finder.find_spec(name, path, target)
+            if spec is None:
+                continue
+            if spec.loader is not None and hasattr(spec.loader, "exec_module"):
+                spec.loader = _TimedLoader(spec.loader, self, name)
+            return spec
+        return None
+
+    def enter(self) -> None:
+        self._stack.append([time.perf_counter(), 0.0])
+
+    def leave(self, name: str) -> None:
+        start, nested = self._stack.pop()
+        elapsed = time.perf_counter() - start
+        self.records.append((name, len(self._stack), elapsed - nested, elapsed))
+        if self._stack:
+            self._stack[-1][1] += elapsed
+
+    def install(self) -> None:
+        sys.meta_path.insert(0, self)
+
+    def uninstall(self) -> None:
+        if self in sys.meta_path:
+            sys.meta_path.remove(self)
+
+
+class StartupTimer:
+    """
+    Wall time per phase of a CLI run plus the imports made along the way,
+    printed by --startup-report.
+    """
+
+    def __init__(self, started: float):
+        self.started = started
+        self._last = started
+        self.phases: list[tuple[str, float]] = []
+        self.imports = ImportTimer()
+        self.imports.install()
+
+    def mark(self, phase: str) -> None:
+        now = time.perf_counter()
+        self.phases.append((phase, now - self._last))
+        self._last = now
+
+    def report(self) -> str:
+        self.imports.uninstall()
+        lines = ["Startup report (rss_relay.__main__ onwards; `python -X importtime` covers the interpreter):"]
+        for phase, seconds in self.phases:
+            lines.append(f"  {phase:<20} {seconds * 1000:9.1f} ms")
+        lines.append(f"  {'total':<20} {(self._last - self.started) * 1000:9.1f} ms")
+
+        records = self.imports.records
+        total = sum(own for _, _, own, _ in records)
+        lines.append(f"\n{len(records)} modules imported, {total * 1000:.1f} ms")
+        lines.append("  top-level imports by cumulative time:")
+        top_level = sorted((r for r in records if r[1] == 0), key=lambda r: r[3], reverse=True)
+        for name, _, own, cumulative in top_level[:TOP_IMPORTS]:
+            lines.append(f"    {cumulative * 1000:9.1f} ms  {name}")
+        lines.append("  slowest modules by self time:")
+        for name, _, own, cumulative in sorted(records, key=lambda r: r[2], reverse=True)[:TOP_IMPORTS]:
+            lines.append(f"    {own * 1000:9.1f} ms  {name}")
+        return "\n".join(lines)
@@ -0,0 +1,158 @@
+#!/usr/bin/python3
+# -*- coding: utf-8 -*-
+
+import sys
+import xml.etree.ElementTree as ET
+
+from .cursor import Cursor
+from .dates import DateNormalizer, to_datetime
+from .entry import Entry
+from .parse import ParseResult
+
+ATOM = "{http://www.w3.org/2005/Atom}"
+MEDIA = "{http://search.yahoo.com/mrss/}"
+DC = "{http://purl.org/dc/elements/1.1/}"
+CONTENT = "{http://purl.org/rss/1.0/modules/content/}"
+
+RSS_ITEM = "item"
+ATOM_ENTRY = ATOM + "entry"
+# Document roots this parser reads; anything else (RSS 1.0 / RDF, ...) is left to feedparser
+ROOTS = ("rss", ATOM + "feed")
+
+
+def _text(elem: ET.Element | None) -> str:
+    if elem is None:
+        return ""
+    if elem.get("type") == "xhtml":
+        return "".join(ET.tostring(child, encoding="unicode") for child in elem)
+    return "".join(elem.itertext()).strip()
+
+
+def _thumbnail(elem: ET.Element) -> str | None:
+    thumb = elem.find(MEDIA + "thumbnail")
+    if thumb is not None and thumb.get("url"):
+        return thumb.get("url")
+    for tag in (MEDIA + "content", "enclosure"):
+        for media in elem.iter(tag):
+            if media.get("url") and media.get("type", "image/").startswith("image/"):
+                return media.get("url")
+    return None
+
+
+class StreamingFeedParser:
+    """
+    Incremental RSS 2.0 / Atom parser fed with raw chunks as they arrive.
+
+    Every finished <item>/<entry> is read for its guid, link and date first.
+    Entries whose key is_known() reports as seen are dropped without building
+    an Entry, and the element is cleared right away so the document is never
+    held in memory. Once a newest-first feed reaches its
+    cursor, feed() returns True and the caller can stop reading the response.
+
+    Malformed XML sets failed; the caller should then read the rest of the
+    body and fall back to feedparser. So does a document this parser cannot
+    read (a root other than <rss> or <feed>, such as RSS 1.0 / RDF, or no
+    items at all), so such a feed never silently turns up empty.
+    """
+
+    def __init__(self, cursor: Cursor | None = None, is_known=None, dates: DateNormalizer | None = None):
+        self.cursor = cursor
+        self.is_known = is_known
+        self.dates = dates or DateNormalizer()
+        self.entries: list[Entry] = []
+        self.newest: Cursor | None = None
+        self.newest_first = True
+        self.published: list[float] = []
+        self.done = False
+        self.failed = False
+        self._last_timestamp: float | None = None
+        self._items = 0
+        self._last_tag: str | None = None  # the root's, once the whole document is read
+        self._parser = ET.XMLPullParser(events=("end",))
+
+    def feed(self, chunk: bytes) -> bool:
+        """
+        Consume a chunk. Returns True once nothing more needs to be read.
+        """
+        if self.done or self.failed:
+            return self.done
+        try:
+            self._parser.feed(chunk)
+            for _, elem in self._parser.read_events():
+                self._last_tag = elem.tag
+                if elem.tag in (RSS_ITEM, ATOM_ENTRY):
+                    self._items += 1
+                    self._handle(elem)
+                    elem.clear()
+                    if self.done:
+                        break
+        except ET.ParseError:
+            self.failed = True
+        return self.done
+
+    def close(self) -> ParseResult:
+        if not self.done and not self.failed:
+            try:
+                self._parser.close()
+                for _, elem in self._parser.read_events():
+                    self._last_tag = elem.tag
+            except ET.ParseError:
+                self.failed = True
+            if not self._items or self._last_tag not in ROOTS:
+                self.failed = True
+        return ParseResult(self.entries, self.newest_first, self.newest, self.dates.preferred, self.published)
+
+    def _handle(self, elem: ET.Element) -> None:
+        if elem.tag == ATOM_ENTRY:
+            link = ""
+            for link_elem in elem.findall(ATOM + "link"):
+                if link_elem.get("rel", "alternate") == "alternate" and link_elem.get("href"):
+                    link = link_elem.get("href")
+                    break
+            guid = _text(elem.find(ATOM + "id")) or link
+            timestamp = self.dates.parse(_text(elem.find(ATOM + "published")) or _text(elem.find(ATOM + "updated")))
+            title_elem = elem.find(ATOM + "title")
+            description_elem = elem.find(ATOM + "summary")
+            if description_elem is None:
+                description_elem = elem.find(ATOM + "content")
+        else:
+            link = _text(elem.find("link"))
+            guid = _text(elem.find("guid")) or link
+            timestamp = self.dates.parse(_text(elem.find("pubDate")) or _text(elem.find(DC + "date")))
+            title_elem = elem.find("title")
+            description_elem = elem.find("description")
+            if description_elem is None:
+                # Like feedparser: the full content when there is no summary
+                description_elem = elem.find(CONTENT + "encoded")
+
+        if elem.tag == ATOM_ENTRY:
+            categories = tuple(sys.intern(c.get("term")) for c in elem.findall(ATOM + "category") if c.get("term"))
+        else:
+            categories = tuple(sys.intern(_text(c)) for c in elem.findall("category") if _text(c))
+
+        if timestamp is None or (self._last_timestamp is not None and timestamp > self._last_timestamp):
+            self.newest_first = False
+        self._last_timestamp = timestamp
+
+        if timestamp is not None:
+            self.published.append(timestamp)
+            if self.newest is None:
+                self.newest = Cursor(guid, timestamp)
+
+        cursor = self.cursor
+        if cursor is not None and self.newest_first and (guid == cursor.guid or timestamp < cursor.published):
+            self.done = True
+            return
+
+        if self.is_known is not None and link and self.is_known(link):
+            return
+
+        self.entries.append(Entry(
+            key=link,
+            title=_text(title_elem) or "(no title)",
+            link=link,
+            published=to_datetime(timestamp),
+            description=_text(description_elem),
+            thumbnail_url=_thumbnail(elem),
+            categories=categories,
+        ))
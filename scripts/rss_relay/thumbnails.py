@@ -0,0 +1,181 @@
+#!/usr/bin/python3
+# -*- coding: utf-8 -*-
+
+import asyncio
+import codecs
+import os
+import sqlite3
+import time
+from collections import OrderedDict
+from html.parser import HTMLParser
+from urllib.parse import urljoin
+
+import aiohttp
+
+MEMORY_ENTRIES = 512  # article URLs kept in the in-memory LRU
+DISK_ENTRIES = 20000  # rows kept in thumbnails.sqlite3; the oldest go first
+MAX_HEAD_BYTES = 256 * 1024  # og:image lives in <head>; never read more than this
+PAGE_TIMEOUT = 10
+# Meta tags that name an article image, best first
+IMAGE_META = ("og:image:secure_url", "og:image", "og:image:url", "twitter:image", "twitter:image:src")
+
+
+class _HeadDone(Exception):
+    pass
+
+
+class OgImageParser(HTMLParser):
+    """
+    Collects image <meta> tags from a page's <head> and stops at <body>.
+    """
+
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.found: dict[str, str] = {}
+
+    def handle_starttag(self, tag, attrs):
+        if tag == "body":
+            raise _HeadDone
+        if tag != "meta":
+            return
+        attrs = dict(attrs)
+        name = (attrs.get("property") or attrs.get("name") or "").lower()
+        content = (attrs.get("content") or "").strip()
+        if name in IMAGE_META and content and name not in self.found:
+            self.found[name] = content
+
+    def handle_endtag(self, tag):
+        if tag == "head":
+            raise _HeadDone
+
+    @property
+    def image(self) -> str | None:
+        for name in IMAGE_META:
+            if name in self.found:
+                return self.found[name]
+        return None
+
+
+class ThumbnailResolver:
+    """
+    Finds an image for entries whose feed item carries none, from the
+    article's og:image (or twitter:image) tag.
+
+    Pages are fetched concurrently, at most `concurrency` at a time, and only
+    up to the end of <head>. Every answer, including "no image", is cached by
+    article URL in a memory LRU in front of thumbnails.sqlite3, so a page is
+    scraped once, ever; concurrent lookups of the same URL share one fetch.
+    """
+
+    def __init__(self, path: str, concurrency: int = 4):
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self.conn = sqlite3.connect(path)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute(
+            "CREATE TABLE IF NOT EXISTS thumbnails ("
+            " url TEXT PRIMARY KEY,"
+            " image TEXT,"
+            " fetched REAL NOT NULL"
+            ") WITHOUT ROWID"
+        )
+        self.conn.execute("CREATE INDEX IF NOT EXISTS thumbnails_fetched ON thumbnails (fetched)")
+        self.conn.commit()
+        self._memory: OrderedDict[str, str | None] = OrderedDict()
+        self._pending: dict[str, asyncio.Future] = {}
+        self._slots = asyncio.Semaphore(concurrency)
+        self._writes = 0
+
+    def cached(self, url: str) -> tuple[bool, str | None]:
+        """
+        (hit, image) from memory or disk.
+        """
+        if url in self._memory:
+            self._memory.move_to_end(url)
+            return True, self._memory[url]
+        row = self.conn.execute("SELECT image FROM thumbnails WHERE url = ?", (url,)).fetchone()
+        if row is None:
+            return False, None
+        self._remember(url, row[0])
+        return True, row[0]
+
+    def _remember(self, url: str, image: str | None) -> None:
+        self._memory[url] = image
+        self._memory.move_to_end(url)
+        while len(self._memory) > MEMORY_ENTRIES:
+            self._memory.popitem(last=False)
+
+    def _store(self, url: str, image: str | None) -> None:
+        self._remember(url, image)
+        with self.conn:
+            self.conn.execute("INSERT OR REPLACE INTO thumbnails (url, image, fetched) VALUES (?, ?, ?)",
+                              (url, image, time.time()))
+        self._writes += 1
+        if self._writes % 500 == 0:
+            self.prune()
+
+    def prune(self) -> int:
+        with self.conn:
+            cur = self.conn.execute(
+                "DELETE FROM thumbnails WHERE url IN ("
+                " SELECT url FROM thumbnails ORDER BY fetched DESC LIMIT -1 OFFSET ?)",
+                (DISK_ENTRIES,),
+            )
+        return cur.rowcount
+
+    async def _fetch(self, session: aiohttp.ClientSession, url: str) -> str | None:
+        async with self._slots:
+            async with session.get(url, timeout=aiohttp.ClientTimeout(total=PAGE_TIMEOUT)) as resp:
+                if resp.status != 200 or "html" not in resp.headers.get("Content-Type", "html"):
+                    return None
+                parser = OgImageParser()
+                decoder = codecs.getincrementaldecoder(resp.charset or "utf-8")(errors="replace")
+                size = 0
+                try:
+                    async for chunk in resp.content.iter_chunked(16384):
+                        size += len(chunk)
+                        parser.feed(decoder.decode(chunk))
+                        if size >= MAX_HEAD_BYTES:
+                            break
+                except _HeadDone:
+                    pass
+                image = parser.image
+                return urljoin(str(resp.url), image) if image else None
+
+    async def resolve(self, session: aiohttp.ClientSession, url: str) -> str | None:
+        hit, image = self.cached(url)
+        if hit:
+            return image
+        if url in self._pending:
+            return await asyncio.shield(self._pending[url])
+        future = asyncio.get_running_loop().create_future()
+        self._pending[url] = future
+        try:
+            image = await self._fetch(session, url)
+            self._store(url, image)
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except Exception as e:
+            # Not cached: a network error may not happen next time
+            print(f"Could not fetch og:image from {url}: {e}")
+            image = None
+        finally:
+            del self._pending[url]
+        future.set_result(image)
+        return image
+
+    async def fill(self, session: aiohttp.ClientSession, jobs) -> None:
+        """
+        Set thumbnail_url on every job that has none, fetching pages concurrently.
+        """
+        missing = [job for job in jobs if not job.thumbnail_url and job.link]
+        if not missing:
+            return
+        images = await asyncio.gather(*(self.resolve(session, job.link) for job in missing))
+        for job, image in zip(missing, images):
+            job.thumbnail_url = image
+
+    def close(self) -> None:
+        self.conn.close()
@@ -0,0 +1,143 @@
+#!/usr/bin/python3
+# -*- coding: utf-8 -*-
+
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from typing import TYPE_CHECKING
+
+from .ratelimit import RateLimiter
+
+if TYPE_CHECKING:
+    # Only for annotations: the outbox imports DeliveryJob, and the
+    # maintenance commands that open it should not have to load aiohttp
+    import aiohttp
+
+EMBED_COLOR = 0x00FFFF  # Cyan-ish
+MAX_RATE_LIMIT_RETRIES = 5
+
+# Embeds allowed in one webhook message, per platform
+MAX_EMBEDS = {"discord": 10, "guilded": 1}
+# Discord limit on the combined text of all embeds in one message
+MAX_MESSAGE_CHARS = 6000
+# Per-embed limits, per platform
+MAX_TITLE_CHARS = 256
+MAX_DESCRIPTION_CHARS = {"discord": 4096, "guilded": 2048}
+
+
+class WebhookError(RuntimeError):
+    """
+    A webhook answered with an error status other than 429.
+    """
+
+    def __init__(self, status: int, text: str):
+        super().__init__(f"Webhook error {status}: {text}")
+        self.status = status
+
+
+@dataclass
+class DeliveryJob:
+    feed_name: str
+    webhook_type: str
+    webhook_url: str
+    key: str
+    title: str
+    link: str
+    description: str
+    timestamp: datetime
+    thumbnail_url: str | None = None
+    sink: str = ""  # name of the feed's sink; "" is the first one
+    id: int | None = None  # outbox row id
+
+
+def _truncate(text: str, limit: int) -> str:
+    if len(text) <= limit:
+        return text
+    return text[:limit - 3].rstrip() + "..."
+
+
+def _embed_description(job: DeliveryJob) -> str:
+    read_more = f"[Read more]({job.link})"
+    if not job.description:
+        return read_more
+    limit = MAX_DESCRIPTION_CHARS.get(job.webhook_type, 2048) - len(read_more) - 2
+    return f"{_truncate(job.description, limit)}\n\n{read_more}"
+
+
+def build_embed(job: DeliveryJob) -> dict:
+    """
+    Embed payload for the job's platform. Discord and Guilded take the same
+    shape; only the length limits differ.
+    """
+    embed = {
+        "title": _truncate(job.title, MAX_TITLE_CHARS),
+        "description": _embed_description(job),
+        "url": job.link,
+        "color": EMBED_COLOR,
+        # ISO8601 with timezone
+        "timestamp": job.timestamp.astimezone(timezone.utc).isoformat(),
+    }
+    if job.thumbnail_url:
+        embed["image"] = {"url": job.thumbnail_url}
+    return embed
+
+
+async def post_webhook(session: "aiohttp.ClientSession", limiter: RateLimiter, webhook_url: str, payload: dict) -> None:
+    """
+    POST a payload, paced by the webhook's rate-limit headers. A 429 waits for
+    retry_after and tries again; any other error is raised.
+    """
+    for _ in range(MAX_RATE_LIMIT_RETRIES + 1):
+        await limiter.acquire(webhook_url)
+        async with session.post(webhook_url, json=payload) as resp:
+            limiter.update(webhook_url, resp.headers)
+            if 200 <= resp.status < 300:
+                return
+            if resp.status == 429:
+                try:
+                    body = await resp.json(content_type=None)
+                except ValueError:
+                    body = None
+                retry_after = limiter.rate_limited(webhook_url, resp.headers, body)
+                print(f"Rate limited by webhook; retrying in {retry_after:.1f}s")
+                continue
+            raise WebhookError(resp.status, await resp.text())
+    raise RuntimeError(f"Webhook still rate limited after {MAX_RATE_LIMIT_RETRIES} retries")
+
+
+def embed_size(embed: dict) -> int:
+    """
+    Characters of an embed that count towards the per-message total.
+    """
+    return len(embed["title"]) + len(embed["description"])
+
+
+def pack_messages(jobs: list[DeliveryJob]) -> list[list[tuple[DeliveryJob, dict]]]:
+    """
+    Group jobs for one webhook into messages, in order, each within the
+    platform's embed count and Discord's total character limit.
+    """
+    messages = []
+    current, current_size = [], 0
+    for job in jobs:
+        embed = build_embed(job)
+        size = embed_size(embed)
+        max_embeds = MAX_EMBEDS.get(job.webhook_type, 1)
+        if current and (len(current) >= max_embeds or current_size + size > MAX_MESSAGE_CHARS):
+            messages.append(current)
+            current, current_size = [], 0
+        current.append((job, embed))
+        current_size += size
+    if current:
+        messages.append(current)
+    return messages
+
+
+async def deliver(session: "aiohttp.ClientSession", limiter: RateLimiter,
+                  message: list[tuple[DeliveryJob, dict]]) -> None:
+    """
+    Send one message of embeds (see pack_messages) to its Discord or Guilded
+    webhook. Both accept the same JSON body, so Guilded is posted directly
+    instead of through guilded_webhook in order to see its rate-limit responses.
+    """
+    webhook_url = message[0][0].webhook_url
+    await post_webhook(session, limiter, webhook_url, {"content": "", "embeds": [embed for _, embed in message]})
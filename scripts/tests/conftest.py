@@ -0,0 +1,8 @@
+#!/usr/bin/python3
+# -*- coding: utf-8 -*-
+
+import os
+import sys
+
+# The relay is run as `python -m rss_relay` from scripts/, so import it from there
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
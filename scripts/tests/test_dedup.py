@@ -0,0 +1,118 @@
+#!/usr/bin/python3
+# -*- coding: utf-8 -*-
+
+import os
+import time
+
+import pytest
+
+from rss_relay.dedup import DedupDatabase, HashIndexStore, TextDedupStore
+
+KEYS = [f"https://example.com/{n}" for n in range(1000)]
+
+
+def open_sqlite(tmp_path):
+    return DedupDatabase(str(tmp_path / "dedup.sqlite3")).store("feed")
+
+
+def open_hashindex(tmp_path):
+    return HashIndexStore(str(tmp_path / "feed.idx"), merge_threshold=64)
+
+
+def open_text(tmp_path):
+    return TextDedupStore(str(tmp_path / "processed_entries_feed.txt"))
+
+
+def close(store):
+    store.close()
+    if hasattr(store, "db"):
+        store.db.close()
+
+
+@pytest.mark.parametrize("open_store", [open_sqlite, open_hashindex, open_text])
+def test_keys_survive_reopening(tmp_path, open_store):
+    store = open_store(tmp_path)
+    for key in KEYS[:500]:
+        store.add(key)
+    assert all(key in store for key in KEYS[:500])
+    close(store)
+
+    store = open_store(tmp_path)
+    assert all(key in store for key in KEYS[:500])
+    assert not any(key in store for key in KEYS[500:])
+    for key in KEYS[500:]:
+        store.add(key)
+    close(store)
+
+    store = open_store(tmp_path)
+    assert all(key in store for key in KEYS)
+    close(store)
+
+
+def test_hashindex_replays_journal_after_a_crash(tmp_path):
+    path = str(tmp_path / "feed.idx")
+    store = HashIndexStore(path, merge_threshold=64)
+    for key in KEYS[:100]:
+        store.add(key)
+    # 64 keys were merged into the index, the other 36 are only in the journal
+    assert os.path.getsize(path + ".log") == 36 * 8
+    # Killed without close(): nothing is merged, and the last write is torn
+    with open(path + ".log", "ab") as f:
+        f.write(b"\x01\x02\x03")
+    store._unmap()
+
+    store = HashIndexStore(path, merge_threshold=64)
+    assert len(store) == 100
+    assert all(key in store for key in KEYS[:100])
+    assert not any(key in store for key in KEYS[100:])
+    store.close()
+    assert not os.path.exists(path + ".log")
+
+    store = HashIndexStore(path, merge_threshold=64)
+    assert len(store) == 100
+    assert all(key in store for key in KEYS[:100])
+    store.close()
+
+
+def test_hashindex_imports_a_processed_entries_file(tmp_path):
+    legacy = tmp_path / "processed_entries_feed.txt"
+    legacy.write_text("\n".join(KEYS[:300]) + "\n", encoding="utf-8")
+    path = str(tmp_path / "feed.idx")
+    store = HashIndexStore(path, import_from=str(legacy))
+    assert not legacy.exists()
+    assert all(key in store for key in KEYS[:300])
+
+    more = tmp_path / "more.txt"
+    more.write_text("\n".join(KEYS[200:400]) + "\n\n", encoding="utf-8")
+    assert store.import_text_file(str(more)) == 100
+    assert store.import_text_file(str(more)) == 0
+    store.close()
+
+    store = HashIndexStore(path)
+    assert len(store) == 400
+    assert all(key in store for key in KEYS[:400])
+    store.close()
+
+
+def test_text_store_import_skips_known_keys(tmp_path):
+    store = open_text(tmp_path)
+    store.add(KEYS[0])
+    other = tmp_path / "other.txt"
+    other.write_text("\n".join([KEYS[0], KEYS[1], KEYS[1], "", KEYS[2]]) + "\n", encoding="utf-8")
+    assert store.import_text_file(str(other)) == 2
+    assert (tmp_path / "processed_entries_feed.txt").read_text(encoding="utf-8").split() == KEYS[:3]
+
+
+def test_sqlite_namespaces_and_expiry(tmp_path):
+    db = DedupDatabase(str(tmp_path / "dedup.sqlite3"), ttl_days=1)
+    first, second = db.store("feed"), db.store("feed.discord")
+    first.add(KEYS[0])
+    assert KEYS[0] in first and KEYS[0] not in second
+    db.flush()
+    with db.conn:
+        db.conn.execute("UPDATE processed SET first_seen = ?", (int(time.time()) - 2 * 86400,))
+    second.add(KEYS[1])
+    db.flush()
+    assert db.expire() == 1
+    assert KEYS[0] not in first and KEYS[1] in second
+    db.close()
@@ -0,0 +1,107 @@
+#!/usr/bin/python3
+# -*- coding: utf-8 -*-
+
+import random
+import re
+from datetime import datetime, timezone
+
+import pytest
+
+from rss_relay.entry import Entry
+from rss_relay.filters import ANY_FIELD, FIELDS, KeywordFilter, Rule, parse_rule
+
+NOW = datetime(2026, 10, 18, 12, 0, tzinfo=timezone.utc)
+# A small alphabet, so literals share long prefixes and end inside each other
+LETTERS = "abAB é"
+REGEXES = (r"^ab", r"b$", r"a+b", r"\bba", r"é\w")
+
+
+def naive_matches(rule: Rule, entry: Entry) -> bool:
+    fields = FIELDS if rule.field == ANY_FIELD else (rule.field,)
+    for field in fields:
+        if field == "category":
+            text = "\n".join(entry.categories)
+        else:
+            text = getattr(entry, field)
+        if rule.regex:
+            if re.search(rule.pattern, text, re.MULTILINE | (re.IGNORECASE if rule.ignore_case else 0)):
+                return True
+        elif rule.ignore_case:
+            if rule.pattern.lower() in text.lower():
+                return True
+        elif rule.pattern in text:
+            return True
+    return False
+
+
+def naive_skips(include: list[Rule], exclude: list[Rule], entry: Entry) -> bool:
+    if any(naive_matches(rule, entry) for rule in exclude):
+        return True
+    return bool(include) and not any(naive_matches(rule, entry) for rule in include)
+
+
+def random_text(rng: random.Random, length: int) -> str:
+    return "".join(rng.choice(LETTERS) for _ in range(length))
+
+
+def random_rules(rng: random.Random) -> list[Rule]:
+    rules = []
+    for _ in range(rng.randint(0, 8)):
+        field = rng.choice(FIELDS + (ANY_FIELD,))
+        if rng.random() < 0.2:
+            rules.append(Rule(field, rng.choice(REGEXES), regex=True, ignore_case=rng.random() < 0.5))
+        else:
+            rules.append(Rule(field, random_text(rng, rng.randint(1, 4)), ignore_case=rng.random() < 0.5))
+    return rules
+
+
+def test_compiled_filter_matches_naive_matcher():
+    rng = random.Random(20261018)
+    for _ in range(500):
+        include, exclude = random_rules(rng), random_rules(rng)
+        keyword_filter = KeywordFilter(include, exclude)
+        for _ in range(20):
+            entry = Entry("k", random_text(rng, rng.randint(0, 12)), "http://x", NOW,
+                          random_text(rng, rng.randint(0, 20)),
+                          categories=tuple(random_text(rng, rng.randint(1, 5)) for _ in range(rng.randint(0, 3))))
+            skipped = keyword_filter.skip_reason(entry) is not None
+            assert skipped == naive_skips(include, exclude, entry), (include, exclude, entry)
+
+
+def test_many_literals_in_one_pattern():
+    words = [f"{a}{b}{c}" for a in "abc" for b in "abc" for c in "abc"] + ["a", "ab", "abcabc"]
+    keyword_filter = KeywordFilter([], [Rule("title", word) for word in words])
+    for title in ("xxaxx", "cab", "bbb", "ccc", "xyz", "A", ""):
+        entry = Entry("k", title, "http://x", NOW)
+        expected = any(word in title for word in words)
+        assert (keyword_filter.skip_reason(entry) is not None) == expected, title
+
+
+@pytest.mark.parametrize("line, rule", [
+    ("(Tamil Dub)", Rule("title", "(Tamil Dub)")),
+    ("title/i: uncensored", Rule("title", "uncensored", ignore_case=True)),
+    ("description/re: \\bsponsor", Rule("description", "\\bsponsor", regex=True)),
+    ("category/i,re: ^anime$", Rule("category", "^anime$", regex=True, ignore_case=True)),
+    ("any: giveaway", Rule("any", "giveaway")),
+])
+def test_parse_rule(line, rule):
+    assert parse_rule(line) == rule
+
+
+def test_unknown_flag_is_rejected():
+    with pytest.raises(ValueError):
+        parse_rule("title/x: foo")
+
+
+def test_description_is_only_cleaned_for_description_rules():
+    calls = []
+
+    def describe():
+        calls.append(1)
+        return "clean text"
+
+    entry = Entry("k", "Show (Dub)", "http://x", NOW, "<p>raw</p>")
+    assert KeywordFilter([], [Rule("title", "(Dub)")]).skip_reason(entry, describe)
+    assert calls == []
+    assert KeywordFilter([], [Rule("description", "clean")]).skip_reason(entry, describe)
+    assert calls == [1]
@@ -0,0 +1,154 @@
+#!/usr/bin/python3
+# -*- coding: utf-8 -*-
+
+import asyncio
+from datetime import datetime, timedelta, timezone
+
+from aiohttp import web
+
+from rss_relay.config import FeedConfig, RelaySettings, Sink
+from rss_relay.outbox import Outbox
+from rss_relay.relay import Relay
+from rss_relay.webhooks import DeliveryJob
+
+NOW = datetime(2026, 10, 18, 12, 0, tzinfo=timezone.utc)
+
+
+def make_job(key: str, webhook_url: str = "http://127.0.0.1/hook", feed_name: str = "feed",
+             published: datetime = NOW) -> DeliveryJob:
+    return DeliveryJob(feed_name=feed_name, webhook_type="discord", webhook_url=webhook_url, key=key,
+                       title=f"Title {key}", link=key, description="", timestamp=published)
+
+
+def make_relay(tmp_path, webhook_url: str) -> tuple[Relay, Sink]:
+    sink = Sink("discord", "discord", webhook_url, "feed", str(tmp_path / "processed_entries_feed.txt"))
+    feed = FeedConfig(name="feed", rss_feed_url="http://127.0.0.1/feed", sinks=[sink], og_image=False)
+    return Relay(RelaySettings(state_dir=str(tmp_path)), [feed]), sink
+
+
+async def start_webhook(posts: list) -> tuple[web.AppRunner, str]:
+    async def hook(request: web.Request) -> web.Response:
+        posts.append(await request.json())
+        return web.Response(status=204)
+
+    app = web.Application()
+    app.router.add_post("/hook", hook)
+    runner = web.AppRunner(app, access_log=None)
+    await runner.setup()
+    site = web.TCPSite(runner, "127.0.0.1", 0)
+    await site.start()
+    port = site._server.sockets[0].getsockname()[1]
+    return runner, f"http://127.0.0.1:{port}/hook"
+
+
+def test_recording_failure_after_post_posts_once(tmp_path):
+    async def run():
+        posts = []
+        runner, webhook_url = await start_webhook(posts)
+        relay, sink = make_relay(tmp_path, webhook_url)
+        store = relay.states["feed"].processed(sink)
+
+        def locked():
+            raise RuntimeError("database is locked")
+
+        store.flush = locked
+        try:
+            relay.outbox.enqueue(make_job("https://example.com/1", webhook_url))
+            await asyncio.wait_for(relay.dispatcher(drain=True), 10)
+            assert relay.outbox.counts() == {}
+            assert not relay.in_flight
+        finally:
+            del store.flush  # the lock is gone by shutdown
+            await relay.close()
+            await runner.cleanup()
+        return posts
+
+    posts = asyncio.run(run())
+    assert len(posts) == 1
+
+
+def test_due_hands_out_oldest_entries_first(tmp_path):
+    outbox = Outbox(str(tmp_path / "outbox.sqlite3"))
+    # Discovered newest first, as a newest-first feed lists them
+    for n in reversed(range(150)):
+        outbox.enqueue(make_job(f"https://example.com/{n}", published=NOW + timedelta(minutes=n)))
+    first = outbox.due(64, set())
+    assert [job.key for job in first] == [f"https://example.com/{n}" for n in range(64)]
+    second = outbox.due(64, {job.id for job in first})
+    assert [job.key for job in second] == [f"https://example.com/{n}" for n in range(64, 128)]
+    outbox.close()
+
+
+def test_backlog_larger_than_a_batch_is_posted_in_order(tmp_path):
+    async def run():
+        posts = []
+        runner, webhook_url = await start_webhook(posts)
+        relay, _ = make_relay(tmp_path, webhook_url)
+        try:
+            for n in reversed(range(150)):
+                relay.outbox.enqueue(make_job(f"https://example.com/{n}", webhook_url,
+                                              published=NOW + timedelta(minutes=n)))
+            await asyncio.wait_for(relay.dispatcher(drain=True), 30)
+        finally:
+            await relay.close()
+            await runner.cleanup()
+        return posts
+
+    posts = asyncio.run(run())
+    links = [embed["url"] for post in posts for embed in post["embeds"]]
+    assert links == [f"https://example.com/{n}" for n in range(150)]
+
+
+def test_enqueue_ignores_an_entry_already_queued(tmp_path):
+    outbox = Outbox(str(tmp_path / "outbox.sqlite3"))
+    assert outbox.enqueue(make_job("https://example.com/1"))
+    assert not outbox.enqueue(make_job("https://example.com/1"))
+    assert outbox.enqueue(make_job("https://example.com/1", webhook_url="http://127.0.0.1/other"))
+    assert outbox.contains("feed", "https://example.com/1")
+    assert outbox.counts() == {"pending": 2}
+    outbox.close()
+
+
+def test_failed_job_waits_for_its_retry(tmp_path):
+    outbox = Outbox(str(tmp_path / "outbox.sqlite3"), base_delay=60)
+    outbox.enqueue(make_job("https://example.com/1"))
+    job, = outbox.due(10, set())
+    assert not outbox.failed(job.id, "HTTP 500")
+    assert outbox.due(10, set()) == []
+    assert 30 <= outbox.next_due_in() <= 60
+    assert outbox.counts() == {"pending": 1}
+    outbox.close()
+
+
+def test_job_is_dead_after_max_attempts_and_can_be_requeued(tmp_path):
+    path = str(tmp_path / "outbox.sqlite3")
+    outbox = Outbox(path, max_attempts=3, base_delay=0)
+    outbox.enqueue(make_job("https://example.com/1"))
+    job, = outbox.due(10, set())
+    assert [outbox.failed(job.id, "HTTP 500") for _ in range(3)] == [False, False, True]
+    assert outbox.due(10, set()) == []
+    assert outbox.next_due_in() is None
+    assert outbox.counts() == {"dead": 1}
+    outbox.close()
+
+    # Dead rows survive a restart, and requeueing gives them fresh attempts
+    outbox = Outbox(path, max_attempts=3, base_delay=0)
+    assert outbox.requeue_dead() == 1
+    job, = outbox.due(10, set())
+    assert job.key == "https://example.com/1"
+    assert not outbox.failed(job.id, "HTTP 500")
+    outbox.delivered(job.id)
+    assert outbox.counts() == {}
+    assert not outbox.contains("feed", "https://example.com/1")
+    outbox.close()
+
+
+def test_dead_letter_skips_the_remaining_attempts(tmp_path):
+    outbox = Outbox(str(tmp_path / "outbox.sqlite3"))
+    outbox.enqueue(make_job("https://example.com/1"))
+    outbox.enqueue(make_job("https://example.com/2"))
+    first, second = outbox.due(10, set())
+    outbox.dead_letter(first.id, "feed [feed] is no longer configured")
+    assert outbox.due(10, set()) == [second]
+    assert outbox.counts() == {"dead": 1, "pending": 1}
+    outbox.close()
@@ -0,0 +1,53 @@
+#!/usr/bin/python3
+# -*- coding: utf-8 -*-
+
+import asyncio
+import threading
+from datetime import datetime, timezone
+
+from rss_relay.config import FeedConfig, Sink
+from rss_relay.entry import Entry
+from rss_relay.filters import KeywordFilter, Rule
+from rss_relay.pipeline import EntryPipeline
+
+NOW = datetime(2026, 10, 18, 12, 0, tzinfo=timezone.utc)
+SINK = Sink("discord", "discord", "http://127.0.0.1/hook", "feed", "processed_entries_feed.txt")
+
+
+def make_pipeline(known: set[str]) -> tuple[EntryPipeline, list]:
+    feed = FeedConfig(name="feed", rss_feed_url="http://127.0.0.1/feed", sinks=[SINK], only_today=False)
+    keyword_filter = KeywordFilter([], [Rule("title", "(Dub)")])
+    pipeline = EntryPipeline(feed, keyword_filter, lambda key: [] if key in known else [SINK], timezone.utc)
+    cleaned = []
+    clean = pipeline.clean
+
+    def recording_clean(entry: Entry) -> str:
+        cleaned.append((entry.key, threading.current_thread()))
+        return clean(entry)
+
+    pipeline.clean = recording_clean
+    return pipeline, cleaned
+
+
+ENTRIES = [
+    Entry("1", "One", "http://x/1", NOW, "<p>one</p>"),
+    Entry("2", "Two (Dub)", "http://x/2", NOW, "<p>two</p>"),
+    Entry("3", "Three", "http://x/3", NOW, "<p>three</p>"),
+    Entry("4", "Four", "", NOW, "<p>four</p>"),
+]
+
+
+def test_only_survivors_are_cleaned_off_the_loop():
+    pipeline, cleaned = make_pipeline(known={"3"})
+    jobs, counts = asyncio.run(pipeline.run(ENTRIES))
+    assert [(job.key, job.description) for job in jobs] == [("1", "one")]
+    assert counts == {"seen": 4, "no_link": 1, "dedup": 1, "keyword": 1, "queued": 1}
+    assert [key for key, _ in cleaned] == ["1"]
+    assert all(thread is not threading.main_thread() for _, thread in cleaned)
+
+
+def test_inline_run_cleans_on_the_loop():
+    pipeline, cleaned = make_pipeline(known=set())
+    jobs, _ = asyncio.run(pipeline.run(ENTRIES, inline=True))
+    assert [job.key for job in jobs] == ["1", "3"]
+    assert [thread for _, thread in cleaned] == [threading.main_thread()] * 2
@@ -0,0 +1,75 @@
+#!/usr/bin/python3
+# -*- coding: utf-8 -*-
+
+import random
+
+import pytest
+
+from rss_relay.bench.sanitize import clean_with_bs4
+from rss_relay.sanitize import sanitize_description
+
+pytest.importorskip("bs4")
+
+TAGS = ("p", "div", "b", "i", "a", "span", "li", "ul", "br", "img", "script", "style", "em", "h2", "tr", "td")
+TEXT = ("Hello", " world ", "price < $5", "a & b", "&amp;", "&copy;", "x > y", "\n", "  ", "&#39;", "1 < 2 > 0")
+STRIP_TAGS = (["img", "br"], ["p"], ["img", "br", "p"], ["div", "script"], ["b"])
+
+
+@pytest.mark.parametrize("html, strip_tags", [
+    # HTMLParser hands one text node over in several pieces
+    ("Deal: price < $5 today", ["img"]),
+    ("<p>1 < 2 > 0</p><p>x</p>", ["img"]),
+    ("fish<!-- ad -->chips", ["img"]),
+    ("a<![CDATA[b < c]]>d", ["img"]),
+    # A stripped element left open ends with its parent
+    ("<div><p>Intro</div><div>Body text of the article</div>", ["p"]),
+    ("<ul><li><p>one</li><li>two</li></ul>", ["p"]),
+    ("<div><p><b>Intro</div>after", ["p"]),
+    # Stray end tags, and end tags of void elements
+    ("</p>one</div>two", ["p"]),
+    ("<br>one</br>two<br/>three", ["br"]),
+    ("<img>one<img/>two</img>three", ["img"]),
+    # Hidden and nested stripped elements
+    ("<script>x</script>one<style>y</style>two", []),
+    ("<ruby>漢<rp>(</rp><rt>kan</rt><rp>)</rp></ruby>字", []),
+    ("<p>a<p>b</p>c</p>d", ["p"]),
+])
+def test_text_matches_beautifulsoup(html, strip_tags):
+    assert sanitize_description(html, strip_tags) == clean_with_bs4(html, strip_tags)
+
+
+def test_random_markup_matches_beautifulsoup():
+    rng = random.Random(20261018)
+    for _ in range(2000):
+        parts = []
+        for _ in range(rng.randint(1, 25)):
+            r = rng.random()
+            tag = rng.choice(TAGS)
+            if r < 0.3:
+                parts.append(f"<{tag}>")
+            elif r < 0.5:
+                parts.append(f"</{tag}>")
+            elif r < 0.55:
+                parts.append(f"<{tag}/>")
+            elif r < 0.58:
+                parts.append("<!-- c -->")
+            else:
+                parts.append(rng.choice(TEXT))
+        html = "".join(parts)
+        strip_tags = rng.choice(STRIP_TAGS)
+        assert sanitize_description(html, strip_tags) == clean_with_bs4(html, strip_tags), html
+
+
+def test_markdown_keeps_inline_markup():
+    html = '<p>Hello <b>world</b> <a href="http://x">link</a></p><ul><li>one<li>two</ul>'
+    assert sanitize_description(html, ["img"], markdown=True) == "Hello **world** [link](http://x)\n- one\n- two"
+
+
+def test_markdown_closes_elements_left_open():
+    assert sanitize_description("<b>bold <i>both", [], markdown=True) == "**bold *both***"
+
+
+def test_output_is_truncated():
+    text = sanitize_description("<p>" + "word " * 2000 + "</p>", [], max_length=100)
+    assert len(text) <= 100
+    assert text.endswith("…")
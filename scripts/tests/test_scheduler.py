@@ -0,0 +1,61 @@
+#!/usr/bin/python3
+# -*- coding: utf-8 -*-
+
+import random
+
+from rss_relay.scheduler import HOUR, WEEK, WINDOW_WEEKS, FeedSchedule, ScheduleStore, hour_of_week
+
+DAY = 24 * HOUR
+START = 2900 * WEEK  # a week boundary
+
+
+def learn(schedule: FeedSchedule, days: int, entries_of_day) -> FeedSchedule:
+    for day in range(days):
+        schedule.record_poll(entries_of_day(START + day * DAY))
+    return schedule
+
+
+def test_busy_simulcast_feed_learns_its_slots():
+    # 40 entries a day, 30 of them in the 16:00 and 17:00 release slots
+    rng = random.Random(1)
+
+    def entries(day):
+        return ([day + rng.choice((16, 17)) * HOUR + rng.uniform(0, 3000) for _ in range(30)]
+                + [day + rng.uniform(0, DAY) for _ in range(10)])
+
+    schedule = learn(FeedSchedule(300, 60, 3600), 14, entries)
+    expected = {hour_of_week(START + day * DAY + slot * HOUR) for day in range(7) for slot in (16, 17)}
+    assert schedule.windows() == expected
+
+
+def test_weekly_feed_learns_its_slot():
+    schedule = learn(FeedSchedule(300, 60, 3600), 15, lambda day: [day + 20 * HOUR] if day % WEEK == 0 else [])
+    assert schedule.windows() == {hour_of_week(START + 20 * HOUR)}
+
+
+def test_burst_in_one_week_is_not_a_window():
+    schedule = FeedSchedule(300, 60, 3600)
+    schedule.record_poll([START + 20 * HOUR + minute * 60 for minute in range(10)])
+    assert schedule.windows() == set()
+
+
+def test_feed_busy_around_the_clock_has_no_windows():
+    rng = random.Random(2)
+    schedule = learn(FeedSchedule(300, 60, 3600), 28, lambda day: [day + rng.uniform(0, DAY) for _ in range(40)])
+    assert schedule.windows() == set()
+
+
+def test_old_weeks_are_forgotten():
+    schedule = learn(FeedSchedule(300, 60, 3600), 7 * (WINDOW_WEEKS + 4), lambda day: [day + 12 * HOUR])
+    newest = (START + 7 * (WINDOW_WEEKS + 4) * DAY) // WEEK
+    assert all(newest - WINDOW_WEEKS <= week < newest for weeks in schedule.slots.values() for week in weeks)
+
+
+def test_slots_survive_a_restart(tmp_path):
+    path = str(tmp_path / "schedule.json")
+    store = ScheduleStore(path)
+    schedule = learn(store.schedule("feed", 300, 60, 3600), 15, lambda day: [day + 8 * HOUR])
+    store.update("feed", schedule)
+    reloaded = ScheduleStore(path).schedule("feed", 300, 60, 3600)
+    assert reloaded.slots == schedule.slots
+    assert reloaded.windows() == schedule.windows() != set()
@@ -0,0 +1,58 @@
+#!/usr/bin/python3
+# -*- coding: utf-8 -*-
+
+import pytest
+
+from rss_relay.parse import ParseResult, parse_feed
+from rss_relay.stream import StreamingFeedParser
+
+RSS = b"""<?xml version="1.0"?>
+<rss version="2.0" xmlns:content="http://purl.org/rss/1.0/modules/content/"><channel><title>t</title>
+<item><title>A</title><link>http://x/a</link><pubDate>Thu, 01 Oct 2026 10:00:00 GMT</pubDate>
+<content:encoded><![CDATA[<p>Full <b>A</b></p>]]></content:encoded></item>
+<item><title>B</title><link>http://x/b</link><pubDate>Wed, 30 Sep 2026 10:00:00 GMT</pubDate>
+<description>short B</description><content:encoded><![CDATA[<p>Full B</p>]]></content:encoded></item>
+<item><title>C</title><link>http://x/c</link><pubDate>Tue, 29 Sep 2026 10:00:00 GMT</pubDate>
+<description></description><content:encoded><![CDATA[<p>Full C</p>]]></content:encoded></item>
+</channel></rss>"""
+
+RDF = b"""<?xml version="1.0"?>
+<rdf:RDF xmlns:rdf="http://www.w3.org/1999/02/22-rdf-syntax-ns#" xmlns="http://purl.org/rss/1.0/"
+         xmlns:dc="http://purl.org/dc/elements/1.1/">
+<channel rdf:about="http://x"><title>x</title><link>http://x</link><description>d</description></channel>
+<item rdf:about="http://x/1"><title>One</title><link>http://x/1</link><dc:date>2026-10-01T10:00:00Z</dc:date></item>
+<item rdf:about="http://x/2"><title>Two</title><link>http://x/2</link><dc:date>2026-09-30T10:00:00Z</dc:date></item>
+</rdf:RDF>"""
+
+
+def stream(body: bytes, chunk_size: int = 64) -> tuple[StreamingFeedParser, ParseResult]:
+    parser = StreamingFeedParser()
+    for i in range(0, len(body), chunk_size):
+        if parser.feed(body[i:i + chunk_size]):
+            break
+    return parser, parser.close()
+
+
+def test_descriptions_match_feedparser():
+    pytest.importorskip("feedparser")
+    parser, result = stream(RSS)
+    assert not parser.failed
+    streamed = [(entry.link, entry.description) for entry in result.entries]
+    assert streamed == [(entry.link, entry.description) for entry in parse_feed(RSS).entries]
+    assert streamed[0] == ("http://x/a", "<p>Full <b>A</b></p>")
+
+
+@pytest.mark.parametrize("body", [
+    RDF,
+    b"<rss version='2.0'><channel><title>empty</title></channel></rss>",
+    b"<opml><body><item>not a feed</item></body></opml>",
+    b"<rss><channel><item><title>cut off",
+])
+def test_unreadable_documents_fall_back(body):
+    parser, _ = stream(body)
+    assert parser.failed
+
+
+def test_rdf_is_read_by_the_fallback():
+    pytest.importorskip("feedparser")
+    assert [entry.link for entry in parse_feed(RDF).entries] == ["http://x/1", "http://x/2"]
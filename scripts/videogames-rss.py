@@ -58,7 +58,7 @@ async def post_to_guilded(rss_feed_url, webhook_url):
                     continue
 
                 link = entry.link
-                thumbnail_url = entry.media_thumbnail[0]['url'] 
+                thumbnail_url = entry.media_thumbnail[0].get('url') if entry.get('media_thumbnail') else None
                 description = entry.description if hasattr(entry, 'description') else ''
 
                 # Use BeautifulSoup to remove img and br tags from the description
@@ -68,7 +68,8 @@ async def post_to_guilded(rss_feed_url, webhook_url):
 
                 # Create a Guilded embed
                 embed = guilded.Embed(title=title, description=f'{str(soup)}\n\n[Read more]({link})', color=0x00ffff, timestamp=pub_date_gmt)
-                embed.set_image(thumbnail_url)
+                if thumbnail_url:
+                    embed.set_image(thumbnail_url)
 
                 # Check if this entry has been processed before
                 if entry.link not in processed_entries_games:
@@ -79,11 +80,11 @@ async def post_to_guilded(rss_feed_url, webhook_url):
 
                     # Update the list of processed entry links
                     save_processed_entry(entry.link)
+
+                    # Add a 3-second delay between posts (skipped entries need none)
+                    await asyncio.sleep(3)
                 else:
                     print(f'Skipping previously posted entry: {title}')
-                    
-                # Add a 3-second delay between posts
-                await asyncio.sleep(3)
 
     except Exception as e:
         print(f'An error occurred: {str(e)}')